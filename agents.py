@@ -0,0 +1,210 @@
+import asyncio
+import math
+import random
+import sys
+import time
+
+from fleet import synthetic_fleet
+from headless import move
+from pairing import best_pair
+from wtpmv6 import load_csv, compute_pg, distance_3d
+
+class Blackboard:
+    # Shared state the plane agents coordinate through. Targets are filed in square x-y cells
+    # one reach wide, so everything a plane can see or hit lies in the 3x3 block around its
+    # own cell. Agents watch their block and are only woken for a tick when a watched cell
+    # changed. Reports and fire claims are intents written by agents during a tick and
+    # resolved centrally only where they conflict.
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # cell -> set of targets
+        self.target_cells = {}  # target -> cell
+        self.watchers = {}  # cell -> set of agents
+        self.changed = set()
+        self.reports = {}  # target -> planes tracking it this tick
+        self.claims = {}  # target -> [(pg, fuel, plane, weapon)]
+        self.pending = 0
+        self.all_decided = asyncio.Event()
+
+    def cell_of(self, position):
+        return (math.floor(position[0] / self.cell_size), math.floor(position[1] / self.cell_size))
+
+    def block(self, cell):
+        return [(cell[0] + dx, cell[1] + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+    def place(self, target):
+        # A moved target changes its cell, and the one it left if it crossed over
+        cell = self.cell_of(target.position)
+        old = self.target_cells.get(target)
+        if old != cell:
+            if old is not None:
+                self.cells[old].discard(target)
+                self.changed.add(old)
+            self.cells.setdefault(cell, set()).add(target)
+            self.target_cells[target] = cell
+        self.changed.add(cell)
+
+    def remove(self, target):
+        cell = self.target_cells.pop(target)
+        self.cells[cell].discard(target)
+        self.changed.add(cell)
+
+    def watch(self, agent, old_block, new_block):
+        for cell in old_block:
+            self.watchers[cell].discard(agent)
+        for cell in new_block:
+            self.watchers.setdefault(cell, set()).add(agent)
+
+    def targets_near(self, block):
+        return [target for cell in block for target in self.cells.get(cell, ())]
+
+    def report(self, plane, target):
+        self.reports.setdefault(target, []).append(plane)
+
+    def claim(self, target, plane, weapon, pg):
+        self.claims.setdefault(target, []).append((pg, plane.fuel, plane, weapon))
+
+    def decided(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self.all_decided.set()
+
+class PlaneAgent:
+    # One coroutine per plane: sleeps until its block of the board changes, then reports every
+    # target it can see and claims the targets in range it can best cover with its own weapons
+    def __init__(self, plane, board, sensor_range):
+        self.plane = plane
+        self.board = board
+        self.sensor_range = sensor_range
+        self.wake = asyncio.Event()
+        self.retired = False
+        self.block = []
+        self.rewatch()
+
+    def rewatch(self):
+        block = self.board.block(self.board.cell_of(self.plane.position))
+        if block != self.block:
+            self.board.watch(self, self.block, block)
+            self.block = block
+
+    def decide(self):
+        # Local weapon-target assignment: best PG first, each weapon and target claimed once
+        candidates = []
+        for target in self.board.targets_near(self.block):
+            if distance_3d(self.plane.position, target.position) <= self.sensor_range:
+                self.board.report(self.plane, target)
+            for i, weapon in enumerate(self.plane.weapons):
+                pg = compute_pg(self.plane, weapon, target)
+                if pg > 0:
+                    candidates.append((pg, i, target))
+        used, claimed = set(), set()
+        for pg, i, target in sorted(candidates, key=lambda c: -c[0]):
+            if i not in used and target not in claimed:
+                used.add(i)
+                claimed.add(target)
+                self.board.claim(target, self.plane, self.plane.weapons[i], pg)
+
+    async def run(self):
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            if self.retired:
+                return
+            self.decide()
+            self.board.decided()
+
+class Swarm:
+    # Drives the agents a tick at a time: move everything, wake the agents whose blocks changed,
+    # wait for their intents, then settle conflicts with the existing rules. A target reported
+    # by more than two planes keeps the most orthogonal pair; a target's claims are tried in
+    # PG order, lower fuel first on ties, skipping weapons already spent this tick.
+    def __init__(self, blue_planes, targets, sensor_range=150, seed=0):
+        self.rng = random.Random(seed)
+        reach = max([sensor_range] + [w.range for plane in blue_planes for w in plane.weapons])
+        self.board = Blackboard(reach)
+        self.targets = targets
+        for target in targets:
+            self.board.place(target)
+        self.agents = [PlaneAgent(plane, self.board, sensor_range) for plane in blue_planes]
+        self.tasks = [asyncio.create_task(agent.run()) for agent in self.agents]
+        self.pairs = {}
+        self.ticks = 0
+        self.kills = 0
+        self.wakeups = 0
+
+    async def tick(self):
+        self.ticks += 1
+        board = self.board
+        move([agent.plane for agent in self.agents], self.targets, self.rng)
+        for agent in self.agents:
+            agent.rewatch()
+        for target in self.targets:
+            board.place(target)
+
+        woken = set()
+        for cell in board.changed:
+            woken |= board.watchers.get(cell, set())
+        board.changed = set()
+        board.reports, board.claims = {}, {}
+        if woken:
+            board.pending = len(woken)
+            board.all_decided.clear()
+            for agent in woken:
+                agent.wake.set()
+            await board.all_decided.wait()
+        self.wakeups += len(woken)
+
+        self.pairs = {target: best_pair(planes, target)[0]
+                      for target, planes in board.reports.items() if len(planes) > 2}
+        spent = set()
+        for target in self.targets[:]:
+            for pg, fuel, plane, weapon in sorted(board.claims.get(target, ()), key=lambda c: (-c[0], c[1])):
+                if id(weapon) not in spent and plane.fire_weapon(weapon):
+                    spent.add(id(weapon))
+                    self.targets.remove(target)
+                    board.remove(target)
+                    self.kills += 1
+                    break
+
+        for agent in [a for a in self.agents if a.plane.fuel <= 0]:
+            agent.retired = True
+            agent.wake.set()
+            board.watch(agent, agent.block, [])
+            self.agents.remove(agent)
+        return len(woken)
+
+    async def run(self, max_ticks=10000):
+        while self.targets and self.agents and self.ticks < max_ticks:
+            await self.tick()
+        for agent in self.agents:
+            agent.retired = True
+            agent.wake.set()
+        await asyncio.gather(*self.tasks)
+        return self
+
+async def demo(scenario, planes, targets):
+    blue_planes, threats = load_csv(scenario)
+    swarm = await Swarm(blue_planes, threats).run()
+    print(f"{scenario}: {swarm.kills} kills in {swarm.ticks} ticks, {swarm.wakeups} agent wakeups")
+
+    fleet = synthetic_fleet(planes, targets, seed=0)
+    fleet.weapon_range *= 0.2
+    blue_planes, threats = fleet.to_objects()
+    start = time.perf_counter()
+    swarm = Swarm(blue_planes, threats, sensor_range=100)
+    for _ in range(20):
+        if not (swarm.targets and swarm.agents):
+            break
+        woken = await swarm.tick()
+        print(f"Tick {swarm.ticks}: {woken} of {len(swarm.agents)} agents woken, {len(swarm.targets)} targets left")
+    await swarm.run(max_ticks=swarm.ticks)
+    print(f"{planes} agents over {swarm.ticks} ticks in {time.perf_counter() - start:.2f} s, {swarm.kills} kills")
+
+def main():
+    scenario = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d_beastmode.csv'
+    planes = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    targets = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    asyncio.run(demo(scenario, planes, targets))
+
+if __name__ == "__main__":
+    main()
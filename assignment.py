@@ -0,0 +1,230 @@
+import sys
+import time
+from collections import deque
+
+from wtpmv6 import load_csv, compute_pg, move_entities
+
+class PGTable:
+    # Sparse PG matrix: targets index rows, (plane, weapon) pairs index columns
+    def __init__(self, blue_planes, targets):
+        self.targets = list(targets)
+        self.weapons = [(plane, weapon) for plane in blue_planes for weapon in plane.weapons]
+        self.values = []  # per target: {weapon index: pg} for positive PG only
+        for target in self.targets:
+            row = {}
+            for wi, (plane, weapon) in enumerate(self.weapons):
+                pg = compute_pg(plane, weapon, target)
+                if pg > 0:
+                    row[wi] = pg
+            self.values.append(row)
+
+    def upper_bound(self):
+        # Every target taking its best weapon, ignoring weapon conflicts
+        return sum(max(row.values(), default=0) for row in self.values)
+
+class AssignmentResult:
+    def __init__(self, table, assigned, phase, elapsed_ms, prices=None):
+        self.table = table
+        self.assigned = assigned  # target index -> weapon index
+        self.phase = phase  # last improvement phase that ran: greedy, swaps or auction
+        self.elapsed_ms = elapsed_ms
+        self.prices = prices or {}  # weapon index -> auction price, reusable as a warm start
+        self.total_pg = total_pg(table, assigned)
+        self.bound = table.upper_bound()
+        self.carried = 0  # pairs kept from a warm start
+
+    def quality(self):
+        return self.total_pg / self.bound if self.bound > 0 else 1.0
+
+    def weapon_prices(self):
+        return {self.table.weapons[wi][1]: price for wi, price in self.prices.items()}
+
+    def shots(self):
+        return [(self.table.weapons[wi][0], self.table.weapons[wi][1], self.table.targets[ti],
+                 self.table.values[ti][wi]) for ti, wi in self.assigned.items()]
+
+def total_pg(table, assigned):
+    return sum(table.values[ti][wi] for ti, wi in assigned.items())
+
+def greedy_assignment(table):
+    edges = sorted(((pg, ti, wi) for ti, row in enumerate(table.values) for wi, pg in row.items()),
+                   key=lambda e: e[0], reverse=True)
+    assigned = {}
+    used = set()
+    for pg, ti, wi in edges:
+        if ti not in assigned and wi not in used:
+            assigned[ti] = wi
+            used.add(wi)
+    return assigned
+
+def improve_by_swaps(table, assigned, deadline):
+    # Moves a target onto a free better weapon, or swaps weapons between two targets,
+    # whenever that raises the total PG; returns False if the deadline cut it short
+    owner = {wi: ti for ti, wi in assigned.items()}
+    improved = True
+    while improved:
+        improved = False
+        for ti, row in enumerate(table.values):
+            if time.perf_counter() > deadline:
+                return False
+            current_wi = assigned.get(ti)
+            current = row.get(current_wi, 0)
+            for wi, pg in row.items():
+                if pg <= current:
+                    continue
+                other = owner.get(wi)
+                if other is None:
+                    gain = pg - current
+                else:
+                    other_row = table.values[other]
+                    if current_wi is not None and current_wi not in other_row:
+                        continue
+                    gain = pg + other_row.get(current_wi, 0) - current - other_row[wi]
+                if gain > 1e-12:
+                    if current_wi is not None:
+                        del owner[current_wi]
+                    if other is not None:
+                        del assigned[other]
+                        if current_wi is not None:
+                            assigned[other] = current_wi
+                            owner[current_wi] = other
+                    assigned[ti] = wi
+                    owner[wi] = ti
+                    current_wi, current = wi, pg
+                    improved = True
+    return True
+
+def default_epsilon(table):
+    return max((max(row.values(), default=0) for row in table.values), default=0) * 1e-3 / (len(table.values) + 1)
+
+def complete_greedily(table, assigned):
+    used = set(assigned.values())
+    for ti, row in enumerate(table.values):
+        if ti not in assigned:
+            free = [(pg, wi) for wi, pg in row.items() if wi not in used]
+            if free:
+                assigned[ti] = max(free)[1]
+                used.add(assigned[ti])
+    return assigned
+
+def auction_assignment(table, deadline, prices=None, assigned=None, epsilon=None):
+    # Gauss-Seidel auction with targets bidding for weapons; staying unassigned is worth 0.
+    # Passing the prices and assignment of a previous solve warm-starts the auction.
+    prices = dict(prices or {})
+    assigned = dict(assigned or {})
+    owner = {wi: ti for ti, wi in assigned.items()}
+    if epsilon is None:
+        epsilon = default_epsilon(table)
+    queue = deque(ti for ti, row in enumerate(table.values) if row and ti not in assigned)
+    finished = True
+    while queue:
+        if time.perf_counter() > deadline:
+            finished = False
+            break
+        ti = queue.popleft()
+        best_wi = None
+        best_value = second_value = 0
+        for wi, pg in table.values[ti].items():
+            value = pg - prices.get(wi, 0)
+            if value > best_value:
+                best_wi, best_value, second_value = wi, value, best_value
+            elif value > second_value:
+                second_value = value
+        if best_wi is None:
+            continue
+        prices[best_wi] = prices.get(best_wi, 0) + best_value - second_value + epsilon
+        previous = owner.get(best_wi)
+        if previous is not None:
+            del assigned[previous]
+            queue.append(previous)
+        owner[best_wi] = ti
+        assigned[ti] = best_wi
+    return assigned, prices, finished
+
+def anytime_assignment(blue_planes, targets, budget_ms=10.0, table=None):
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000
+    table = table or PGTable(blue_planes, targets)
+
+    best = greedy_assignment(table)
+    phase = 'greedy'
+    if improve_by_swaps(table, best, deadline):
+        phase = 'swaps'
+        auctioned, prices, _ = auction_assignment(table, deadline)
+        if improve_by_swaps(table, auctioned, deadline) and total_pg(table, auctioned) > total_pg(table, best):
+            best = auctioned
+            phase = 'auction'
+        return AssignmentResult(table, best, phase, (time.perf_counter() - start) * 1000, prices)
+    return AssignmentResult(table, best, phase, (time.perf_counter() - start) * 1000)
+
+def warm_start(table, previous, epsilon):
+    # Carries last tick's price for every weapon still in the fleet, and keeps each previous
+    # pair whose target and weapon survived, is still in range and is still within epsilon of
+    # the target's best net value at those prices; only pairs failing that rebid
+    target_index = {target: ti for ti, target in enumerate(table.targets)}
+    weapon_index = {weapon: wi for wi, (_, weapon) in enumerate(table.weapons)}
+    prices = {weapon_index[weapon]: price for weapon, price in previous.weapon_prices().items()
+              if weapon in weapon_index}
+    assigned = {}
+    for plane, weapon, target, old_pg in previous.shots():
+        ti = target_index.get(target)
+        wi = weapon_index.get(weapon)
+        if ti is None or wi is None or wi not in table.values[ti]:
+            continue  # Target killed, weapon fired or plane dry, or now out of range
+        row = table.values[ti]
+        best_value = max(pg - prices.get(w, 0) for w, pg in row.items())
+        # Movement and fuel burn shift every PG a little each tick; only a pair that lost
+        # more than its own drift against the target's best option counts as affected
+        if row[wi] - prices.get(wi, 0) >= best_value - epsilon - abs(row[wi] - old_pg):
+            assigned[ti] = wi
+    return assigned, prices
+
+def warm_assignment(blue_planes, targets, previous=None, budget_ms=10.0, table=None):
+    # Greedy is solved first as the baseline, so a warm auction cut short by the deadline can
+    # never return less total PG than greedy_assignment on the same table
+    if previous is None:
+        return anytime_assignment(blue_planes, targets, budget_ms, table)
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000
+    table = table or PGTable(blue_planes, targets)
+    epsilon = default_epsilon(table)
+    baseline = greedy_assignment(table)
+
+    carried, prices = warm_start(table, previous, epsilon)
+    kept = len(carried)
+    assigned, prices, finished = auction_assignment(table, deadline, prices, carried, epsilon)
+    complete_greedily(table, assigned)
+    phase = 'warm auction' if finished else 'warm partial'
+    if finished and improve_by_swaps(table, assigned, deadline):
+        phase = 'warm swaps'
+    if total_pg(table, assigned) < total_pg(table, baseline):
+        assigned, phase = baseline, 'greedy'
+    result = AssignmentResult(table, assigned, phase, (time.perf_counter() - start) * 1000, prices)
+    result.carried = kept
+    return result
+
+def main():
+    blue_planes, targets = load_csv('input_data_3d_beastmode.csv')
+    budget_ms = 5.0
+    # Off by default: every planned shot fires, as in wtpmv6. A positive threshold holds back
+    # shots below that PG so their pairs carry over, at the cost of changing kill outcomes.
+    fire_threshold = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0
+    previous = None
+    tick = 0
+
+    while targets and blue_planes:
+        move_entities(blue_planes, targets)
+        tick += 1
+        result = warm_assignment(blue_planes, targets, previous, budget_ms)
+        for plane, weapon, target, pg in result.shots():
+            if pg > fire_threshold and plane.fire_weapon(weapon):
+                targets.remove(target)
+                print(f"Target {target.id} shot down by Plane {plane.id} with weapon range {weapon.range} km and PG {pg:.4f}")
+        print(f"\nTick {tick}: {len(result.assigned)} planned shots ({result.carried} carried over), "
+              f"total PG {result.total_pg:.4f} ({result.quality():.1%} of bound {result.bound:.4f}), "
+              f"phase {result.phase}, {result.elapsed_ms:.2f} ms of {budget_ms} ms budget")
+        previous = result
+        blue_planes = [plane for plane in blue_planes if plane.fuel > 0]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import sys
+import time
+
+import numpy as np
+
+from fleet import FleetArrays, distance_matrix, pg_matrix, best_pairs
+
+PLANE_SPREAD = 20  # Per-axis jitter of BluePlane.move
+TARGET_SPREAD = 25  # Per-axis jitter of Target.move
+
+class BatchEngine:
+    # B independent replications of one scenario advanced in lockstep. Every state array
+    # carries a leading batch axis; dead planes, weapons and targets are masked, not removed.
+    def __init__(self, fleet, batch, seed=None, sensor_range=np.inf):
+        self.fleet = fleet
+        self.batch = batch
+        self.sensor_range = sensor_range
+        self.rng = np.random.default_rng(seed)
+        self.plane_pos = np.repeat(fleet.plane_pos[None], batch, axis=0)
+        self.fuel = np.repeat(fleet.fuel[None], batch, axis=0)
+        self.target_pos = np.repeat(fleet.target_pos[None], batch, axis=0)
+        self.plane_alive = np.ones(self.fuel.shape, dtype=bool)
+        self.weapon_alive = np.ones((batch, len(fleet.weapon_plane)), dtype=bool)
+        self.target_alive = np.ones(self.target_pos.shape[:2], dtype=bool)
+        self.pairs = np.full(self.target_pos.shape[:2] + (2,), -1)
+        self.ticks = np.zeros(batch, dtype=int)
+        self.kills = np.zeros(batch, dtype=int)
+        self.pg_total = np.zeros(batch)
+
+    def active(self):
+        return self.target_alive.any(axis=1) & self.plane_alive.any(axis=1)
+
+    def move(self, active):
+        moving = active[:, None] & self.plane_alive & (self.fuel > 0)
+        step = self.rng.uniform(-PLANE_SPREAD, PLANE_SPREAD, self.plane_pos.shape)
+        self.plane_pos += np.where(moving[..., None], step, 0)
+        self.fuel = np.where(moving, np.maximum(self.fuel - self.fleet.fuel_burn_rate, 0), self.fuel)
+        drifting = active[:, None] & self.target_alive
+        drift = self.rng.uniform(-TARGET_SPREAD, TARGET_SPREAD, self.target_pos.shape)
+        self.target_pos += np.where(drifting[..., None], drift, 0)
+
+    def pair(self, distance):
+        sees = (distance <= self.sensor_range) & self.plane_alive[:, None, :] & self.target_alive[..., None]
+        return best_pairs(self.target_pos, self.plane_pos, distance, sees)
+
+    def engage(self, pg):
+        # select_best_weapon in target order; each step handles that target in all runs at once
+        runs = np.arange(self.batch)
+        for t in range(pg.shape[1]):
+            row = np.where(self.weapon_alive, pg[:, t, :], 0)
+            best = row.argmax(axis=1)
+            best_pg = row[runs, best]
+            fire = best_pg > 0
+            self.weapon_alive[runs[fire], best[fire]] = False
+            self.target_alive[fire, t] = False
+            self.kills += fire
+            self.pg_total += np.where(fire, best_pg, 0)
+
+    def step(self):
+        active = self.active()
+        if not active.any():
+            return False
+        self.move(active)
+        self.ticks += active
+        distance = distance_matrix(self.target_pos, self.plane_pos)
+        self.pairs = self.pair(distance)
+        pg = pg_matrix(distance, self.fuel, self.fleet)
+        live = active[:, None, None] & self.target_alive[..., None] & self.weapon_alive[:, None, :]
+        self.engage(np.where(live, pg, 0))
+        self.plane_alive &= self.fuel > 0  # Remove planes with zero fuel
+        return True
+
+    def run(self, max_ticks=100000):
+        for _ in range(max_ticks):
+            if not self.step():
+                break
+        return self
+
+def main():
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d_beastmode.csv'
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    fleet = FleetArrays.from_csv(filename)
+
+    start = time.perf_counter()
+    engine = BatchEngine(fleet, batch, seed=0).run()
+    elapsed = time.perf_counter() - start
+
+    print(f"{batch} replications in {elapsed:.2f} s ({batch / elapsed:.0f} runs/s)")
+    print(f"Ticks: mean {engine.ticks.mean():.2f}, max {engine.ticks.max()}")
+    print(f"Kills: mean {engine.kills.mean():.2f} of {len(fleet.target_ids)}, PG per run {engine.pg_total.mean():.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import Process
+
+from headless import run_headless
+
+class JobQueue:
+    # Jobs are leased to a worker connection for lease_timeout seconds, renewed by the worker's
+    # heartbeats up to max_runtime after the lease was granted. If the connection drops, the
+    # lease runs out (a dead or partitioned worker) or hits max_runtime (a worker stuck in a
+    # loop), or the job raised, it goes back on the queue until it has failed `max_retries`
+    # times. A result arriving late from a worker that lost the lease is ignored.
+    def __init__(self, jobs, max_retries=3, lease_timeout=60.0, max_runtime=600.0):
+        self.jobs = {job['job_id']: job for job in jobs}
+        self.queue = deque(self.jobs)
+        self.leases = {}  # job id -> (worker name, deadline, cutoff)
+        self.attempts = {job_id: 0 for job_id in self.jobs}
+        self.results = {}
+        self.errors = {}  # job id -> last error reported for it
+        self.failed = set()
+        self.max_retries = max_retries
+        self.lease_timeout = lease_timeout
+        self.max_runtime = max_runtime
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self._check_finished()
+
+    def lease(self, worker, count):
+        with self.lock:
+            self._expire()
+            batch = []
+            now = time.monotonic()
+            cutoff = now + self.max_runtime
+            while self.queue and len(batch) < count:
+                job_id = self.queue.popleft()
+                self.leases[job_id] = (worker, min(now + self.lease_timeout, cutoff), cutoff)
+                self.attempts[job_id] += 1
+                batch.append(self.jobs[job_id])
+            return batch
+
+    def renew(self, worker):
+        with self.lock:
+            deadline = time.monotonic() + self.lease_timeout
+            for job_id, (owner, _, cutoff) in self.leases.items():
+                if owner == worker:
+                    self.leases[job_id] = (owner, min(deadline, cutoff), cutoff)
+
+    def complete(self, job_id, result, worker):
+        with self.lock:
+            if self.leases.get(job_id, (None,))[0] == worker:
+                del self.leases[job_id]
+                self.results[job_id] = result
+            self._check_finished()
+
+    def fail(self, job_id, error, worker):
+        # The job raised on the worker: counts as an attempt, like a lost lease
+        with self.lock:
+            if self.leases.get(job_id, (None,))[0] == worker:
+                self.errors[job_id] = error
+                self._requeue(job_id)
+            self._check_finished()
+
+    def release(self, worker):
+        # Worker lost: requeue everything it still held
+        with self.lock:
+            for job_id in [j for j, (w, _, _) in self.leases.items() if w == worker]:
+                self._requeue(job_id)
+            self._check_finished()
+
+    def expire(self):
+        with self.lock:
+            self._expire()
+
+    def _expire(self):
+        now = time.monotonic()
+        for job_id in [j for j, (_, deadline, _) in self.leases.items() if deadline < now]:
+            self._requeue(job_id)
+        self._check_finished()
+
+    def _requeue(self, job_id):
+        del self.leases[job_id]
+        if self.attempts[job_id] >= self.max_retries:
+            self.failed.add(job_id)
+        else:
+            self.queue.appendleft(job_id)
+
+    def _check_finished(self):
+        if len(self.results) + len(self.failed) == len(self.jobs):
+            self.finished.set()
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    # One JSON object per line. Worker: {"op": "get", "max_jobs": n}, {"op": "heartbeat"} or
+    # {"op": "result", "results": [[job id, result]], "errors": [[job id, message]]}; coordinator: {"jobs": [...], "done": bool}, where done tells an idle
+    # worker to exit
+    def handle(self):
+        queue = self.server.job_queue
+        worker = f"{self.client_address[0]}:{self.client_address[1]}"
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                if message['op'] == 'get':
+                    jobs = queue.lease(worker, min(message.get('max_jobs', 1), self.server.batch_size))
+                    reply = {'jobs': jobs, 'done': not jobs and queue.finished.is_set()}
+                    self.wfile.write((json.dumps(reply) + '\n').encode())
+                elif message['op'] == 'result':
+                    for job_id, result in message['results']:
+                        queue.complete(job_id, result, worker)
+                    for job_id, error in message.get('errors', []):
+                        queue.fail(job_id, error, worker)
+                elif message['op'] == 'heartbeat':
+                    queue.renew(worker)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            queue.release(worker)
+
+class Coordinator(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, jobs, host='127.0.0.1', port=0, batch_size=8, max_retries=3, lease_timeout=60.0,
+                 max_runtime=600.0):
+        super().__init__((host, port), WorkerHandler)
+        self.job_queue = JobQueue(jobs, max_retries, lease_timeout, max_runtime)
+        self.batch_size = batch_size
+
+    def run_until_done(self, timeout=None):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        # Wake up regularly to expire leases, since a hung worker never polls again
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = min(1.0, self.job_queue.lease_timeout / 4)
+        while not (finished := self.job_queue.finished.wait(interval)):
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            self.job_queue.expire()
+        time.sleep(0.2)  # Let idle workers collect their "done" reply
+        self.shutdown()
+        self.server_close()
+        return finished
+
+def make_jobs(scenarios, seeds, parameter_sets):
+    jobs = []
+    for scenario in scenarios:
+        for seed in seeds:
+            for parameters in parameter_sets:
+                jobs.append({'job_id': len(jobs), 'scenario': scenario, 'seed': seed, 'parameters': parameters})
+    return jobs
+
+def run_worker(host, port, max_jobs=4, idle_wait=0.1, heartbeat_interval=10.0):
+    with socket.create_connection((host, port)) as sock:
+        stream = sock.makefile('rw')
+        write_lock = threading.Lock()
+        stopped = threading.Event()
+
+        def send(message):
+            with write_lock:
+                stream.write(json.dumps(message) + '\n')
+                stream.flush()
+
+        def heartbeat():
+            # Keeps this worker's leases alive while it runs a long batch, up to the coordinator's max_runtime
+            while not stopped.wait(heartbeat_interval):
+                try:
+                    send({'op': 'heartbeat'})
+                except (OSError, ValueError):
+                    return
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            _work(stream, send, max_jobs, idle_wait)
+        finally:
+            stopped.set()
+
+def _work(stream, send, max_jobs, idle_wait):
+    while True:
+        send({'op': 'get', 'max_jobs': max_jobs})
+        line = stream.readline()
+        if not line:
+            return  # Coordinator went away
+        reply = json.loads(line)
+        if reply['done']:
+            return
+        if not reply['jobs']:
+            time.sleep(idle_wait)  # Others still hold leases that may come back
+            continue
+        results, errors = [], []
+        for job in reply['jobs']:
+            try:
+                results.append((job['job_id'], run_headless(job['scenario'], job['seed'], **job['parameters'])))
+            except Exception as error:
+                errors.append((job['job_id'], f"{type(error).__name__}: {error}"))
+        send({'op': 'result', 'results': results, 'errors': errors})
+
+def main():
+    # python coordinator.py                 coordinator plus local workers on localhost
+    # python coordinator.py work HOST PORT  a worker joining a coordinator elsewhere
+    if len(sys.argv) > 1 and sys.argv[1] == 'work':
+        run_worker(sys.argv[2], int(sys.argv[3]))
+        return
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    jobs = make_jobs(['input_data_3d.csv', 'input_data_3d_beastmode.csv'], range(10),
+                     [{'fuel_burn_rate': rate, 'range_scale': scale} for rate in (1, 2, 4) for scale in (0.05, 0.1)])
+    coordinator = Coordinator(jobs)
+    host, port = coordinator.server_address
+    print(f"Coordinator on {host}:{port} with {len(jobs)} jobs")
+
+    processes = [Process(target=run_worker, args=(host, port)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    start = time.perf_counter()
+    coordinator.run_until_done()
+    for process in processes:
+        process.join()
+
+    queue = coordinator.job_queue
+    kills = sum(result['kills'] for result in queue.results.values())
+    print(f"{len(queue.results)} jobs done, {len(queue.failed)} failed in {time.perf_counter() - start:.2f} s; "
+          f"mean kills {kills / max(len(queue.results), 1):.2f}")
+    for job_id in sorted(queue.failed):
+        print(f"Job {job_id} failed: {queue.errors.get(job_id, 'worker lost')}")
+
+if __name__ == "__main__":
+    main()
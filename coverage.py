@@ -0,0 +1,141 @@
+import math
+import sys
+
+from wtpmv6 import (load_csv, distance_3d, select_best_pair, select_best_weapon,
+                    update_reports, move_entities)
+
+PLANE_MAX_STEP = 20 * math.sqrt(3)  # Largest displacement of BluePlane.move in one tick
+TARGET_MAX_STEP = 25 * math.sqrt(3)  # Largest displacement of Target.move in one tick
+
+def max_weapon_range(blue_planes):
+    return max((weapon.range for plane in blue_planes for weapon in plane.weapons), default=0)
+
+class VerletCoverage:
+    # Neighbor lists hold every plane within cutoff + skin of a target at build time.
+    # A pair can only close by the sum of both displacements, so the lists stay
+    # complete for the cutoff until the largest plane and target moves exceed the skin.
+    # An entity added between builds is anchored where it is now, but the other side has
+    # already drifted from its anchors, so it is matched over that much more radius.
+    def __init__(self, cutoff, skin=3 * (PLANE_MAX_STEP + TARGET_MAX_STEP)):
+        self.cutoff = cutoff
+        self.skin = skin
+        self.neighbors = {}  # target -> planes within cutoff + skin at build time
+        self.plane_anchors = {}  # plane -> position at last build
+        self.target_anchors = {}  # target -> position at last build
+        self.rebuilds = 0
+
+    def build(self, blue_planes, targets):
+        self.plane_anchors = {plane: plane.position for plane in blue_planes}
+        self.target_anchors = {}
+        self.neighbors = {}
+        for target in targets:
+            self._add_target(target, blue_planes)
+        self.rebuilds += 1
+
+    def _add_target(self, target, blue_planes, drift=0):
+        radius = self.cutoff + self.skin + drift
+        self.target_anchors[target] = target.position
+        self.neighbors[target] = [plane for plane in blue_planes
+                                  if distance_3d(plane.position, target.position) <= radius]
+
+    def _add_plane(self, plane, drift=0):
+        radius = self.cutoff + self.skin + drift
+        self.plane_anchors[plane] = plane.position
+        for target, planes in self.neighbors.items():
+            if distance_3d(plane.position, target.position) <= radius:
+                planes.append(plane)
+
+    def plane_displacement(self, blue_planes):
+        return max((distance_3d(p.position, self.plane_anchors[p]) for p in blue_planes
+                    if p in self.plane_anchors), default=0)
+
+    def target_displacement(self, targets):
+        return max((distance_3d(t.position, self.target_anchors[t]) for t in targets
+                    if t in self.target_anchors), default=0)
+
+    def max_displacement(self, blue_planes, targets):
+        return self.plane_displacement(blue_planes) + self.target_displacement(targets)
+
+    def update(self, blue_planes, targets):
+        # Returns True when the lists had to be rebuilt from scratch
+        if not self.neighbors or self.max_displacement(blue_planes, targets) > self.skin:
+            self.build(blue_planes, targets)
+            return True
+
+        live_planes = set(blue_planes)
+        live_targets = set(targets)
+        # Compare membership, not counts: one plane leaving as another joins keeps the size
+        if live_planes != self.plane_anchors.keys() or live_targets != self.target_anchors.keys():
+            for target in [t for t in self.target_anchors if t not in live_targets]:
+                del self.target_anchors[target]
+                del self.neighbors[target]
+            for plane in [p for p in self.plane_anchors if p not in live_planes]:
+                del self.plane_anchors[plane]
+            for target in self.neighbors:
+                self.neighbors[target] = [p for p in self.neighbors[target] if p in live_planes]
+            target_drift = self.target_displacement(targets)
+            for plane in blue_planes:
+                if plane not in self.plane_anchors:
+                    self._add_plane(plane, target_drift)
+            plane_drift = self.plane_displacement(blue_planes)
+            for target in targets:
+                if target not in self.target_anchors:
+                    self._add_target(target, blue_planes, plane_drift)
+        return False
+
+    def planes_in_range(self, target, radius=None):
+        radius = self.cutoff if radius is None else radius
+        return [plane for plane in self.neighbors.get(target, [])
+                if distance_3d(plane.position, target.position) <= radius]
+
+    def pg_candidates(self, target):
+        # Only planes within reach of some weapon can produce a positive PG
+        return [(plane, weapon) for plane in self.planes_in_range(target) for weapon in plane.weapons
+                if distance_3d(plane.position, target.position) <= weapon.range]
+
+def coverage_reports(coverage, targets, sensor_range=None):
+    reports = []
+    for target in targets:
+        for plane in coverage.planes_in_range(target, sensor_range):
+            reports.append((plane, target))
+    return reports
+
+def main():
+    blue_planes, targets = load_csv('input_data_3d_beastmode.csv')
+    # Short ranges keep the run going long enough for entities to outgrow the skin
+    range_scale = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    for plane in blue_planes:
+        for weapon in plane.weapons:
+            weapon.range *= range_scale
+    coverage = VerletCoverage(max_weapon_range(blue_planes))
+    tick = 0
+
+    while targets and blue_planes:
+        move_entities(blue_planes, targets)
+        tick += 1
+        if coverage.update(blue_planes, targets):
+            print(f"\nTick {tick}: rebuilt neighbor lists (rebuild #{coverage.rebuilds})")
+
+        reports = coverage_reports(coverage, targets)
+        print("\nAfter Coverage Reporting:")
+        for report in reports:
+            print(f"Plane {report[0].id} is reporting Target {report[1].id}")
+
+        for target in targets:
+            reporting_sensors = coverage.planes_in_range(target)
+            if len(reporting_sensors) > 2:
+                best_pair = select_best_pair(reporting_sensors, target)
+                reports = update_reports(reports, target, best_pair)
+
+        for target in targets[:]:
+            best_plane, best_weapon = select_best_weapon(coverage.planes_in_range(target), target)
+            if best_plane and best_weapon and best_plane.fire_weapon(best_weapon):
+                targets.remove(target)
+                print(f"Target {target.id} shot down by Plane {best_plane.id} with weapon range {best_weapon.range} km")
+
+        blue_planes = [plane for plane in blue_planes if plane.fuel > 0]
+
+    print(f"\nFinished after {tick} ticks with {coverage.rebuilds} neighbor list rebuilds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import sys
+
+from headless import run_headless
+from wtpmv6 import get_reporting_sensors, update_reports
+from pairing import best_pair
+
+class EventStream:
+    # Emits one compact JSON record per change instead of reprinting whole tables: reports
+    # added or removed, sensor pairs changed, shots fired, targets killed and planes run dry,
+    # plus an optional full snapshot every snapshot_interval ticks for readers joining late.
+    # A kill or a dry plane implies its reports are gone, so those removals are not repeated.
+    # Fed by headless.run_tick(), which calls report(), shot() and end_tick() every tick.
+    def __init__(self, sink=None, snapshot_interval=0):
+        self.sink = sink or print
+        self.snapshot_interval = snapshot_interval
+        self.reports = set()  # (plane id, target id)
+        self.pairs = {}  # target id -> (plane id, plane id)
+        self.dry = set()
+        self.emitted = 0
+        self.table_lines = 0  # Lines wtpmv6.main() would have printed for the same ticks
+
+    def emit(self, tick, event, **fields):
+        self.sink(json.dumps(dict(tick=tick, event=event, **fields), separators=(',', ':')))
+        self.emitted += 1
+
+    def report(self, tick, blue_planes, targets):
+        # Round-robin novel track reporting, then best-pair conflict resolution
+        reports = [(blue_planes[i % len(blue_planes)], target) for i, target in enumerate(targets)]
+        self.table_lines += len(reports)
+        pairs = {}
+        for target in targets:
+            reporting_sensors = get_reporting_sensors(target, reports)
+            if len(reporting_sensors) > 2:
+                pairs[target], _ = best_pair(reporting_sensors, target)
+                reports = update_reports(reports, target, pairs[target])
+        self.table_lines += len(reports)
+        self.update_reports(tick, reports)
+        self.update_pairs(tick, pairs)
+
+    def update_reports(self, tick, reports):
+        current = {(plane.id, target.id) for plane, target in reports}
+        for plane, target in sorted(self.reports - current):
+            self.emit(tick, 'report_removed', plane=plane, target=target)
+        for plane, target in sorted(current - self.reports):
+            self.emit(tick, 'report_added', plane=plane, target=target)
+        self.reports = current
+
+    def update_pairs(self, tick, pairs):
+        current = {target.id: (pair[0].id, pair[1].id) for target, pair in pairs.items()}
+        for target in sorted(self.pairs.keys() - current.keys()):
+            self.emit(tick, 'pair_changed', target=target, planes=None)
+        for target, planes in sorted(current.items()):
+            if self.pairs.get(target) != planes:
+                self.emit(tick, 'pair_changed', target=target, planes=list(planes))
+        self.pairs = current
+
+    def shot(self, tick, plane, weapon, target, pg):
+        self.emit(tick, 'shot_fired', plane=plane.id, target=target.id, range=weapon.range, pg=round(pg, 6))
+        self.emit(tick, 'target_killed', target=target.id)
+        self.reports = {(p, t) for p, t in self.reports if t != target.id}
+        self.pairs.pop(target.id, None)
+
+    def end_tick(self, tick, blue_planes, targets):
+        self.table_lines += sum(plane.fuel > 0 for plane in blue_planes)
+        for plane in blue_planes:
+            if plane.fuel <= 0 and plane.id not in self.dry:
+                self.dry.add(plane.id)
+                self.emit(tick, 'plane_dry', plane=plane.id)
+                self.reports = {(p, t) for p, t in self.reports if p != plane.id}
+        if self.snapshot_interval and tick % self.snapshot_interval == 0:
+            self.snapshot(tick, blue_planes, targets)
+
+    def snapshot(self, tick, blue_planes, targets):
+        self.emit(tick, 'snapshot',
+                  planes=[[plane.id, *(round(c, 3) for c in plane.position), plane.fuel]
+                          for plane in blue_planes if plane.fuel > 0],
+                  targets=[[target.id, *(round(c, 3) for c in target.position)] for target in targets],
+                  reports=sorted(self.reports))
+
+def run_events(scenario, stream, seed=0, range_scale=1.0, max_ticks=10000):
+    # Returns the number of ticks and how many table lines main() would have printed
+    result = run_headless(scenario, seed, stream=stream, range_scale=range_scale, max_ticks=max_ticks)
+    return result['ticks'], stream.table_lines
+
+def main():
+    scenario = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d_beastmode.csv'
+    snapshot_interval = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    range_scale = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+    stream = EventStream(snapshot_interval=snapshot_interval)
+    ticks, table_lines = run_events(scenario, stream, range_scale=range_scale)
+    print(f"{stream.emitted} events over {ticks} ticks, where the full tables would print {table_lines} lines",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import numpy as np
+
+from wtpmv6 import load_csv, BluePlane, Weapon, Target
+
+class FleetArrays:
+    # Column view of a scenario: one row per plane, weapon and target
+    def __init__(self, blue_planes, targets):
+        self.plane_ids = np.array([plane.id for plane in blue_planes])
+        self.plane_pos = np.array([plane.position for plane in blue_planes], dtype=float).reshape(-1, 3)
+        self.fuel = np.array([plane.fuel for plane in blue_planes], dtype=float)
+        self.fuel_burn_rate = np.array([plane.fuel_burn_rate for plane in blue_planes], dtype=float)
+
+        weapons = [(i, weapon) for i, plane in enumerate(blue_planes) for weapon in plane.weapons]
+        self.weapon_plane = np.array([i for i, _ in weapons], dtype=np.intp)
+        self.weapon_range = np.array([w.range for _, w in weapons], dtype=float)
+        self.weapon_kinematics = np.array([w.kinematics for _, w in weapons], dtype=float)
+        self.weapon_expiring = np.array([w.expiring_factor for _, w in weapons], dtype=float)
+
+        self.target_ids = np.array([target.id for target in targets])
+        self.target_pos = np.array([target.position for target in targets], dtype=float).reshape(-1, 3)
+
+    @classmethod
+    def from_csv(cls, filename):
+        return cls(*load_csv(filename))
+
+    def to_objects(self):
+        blue_planes = [BluePlane(int(i), tuple(map(float, pos)), float(fuel))
+                       for i, pos, fuel in zip(self.plane_ids, self.plane_pos, self.fuel)]
+        for p, r, k, e in zip(self.weapon_plane, self.weapon_range, self.weapon_kinematics, self.weapon_expiring):
+            blue_planes[p].add_weapon(Weapon(float(r), float(k), float(e)))
+        targets = [Target(int(i), tuple(map(float, pos))) for i, pos in zip(self.target_ids, self.target_pos)]
+        return blue_planes, targets
+
+def distance_matrix(target_pos, plane_pos):
+    # (..., T, 3) and (..., P, 3) -> (..., T, P)
+    return np.linalg.norm(target_pos[..., :, None, :] - plane_pos[..., None, :, :], axis=-1)
+
+def pg_matrix(distance, fuel, fleet):
+    # Vectorized probability_of_guide: (..., T, P) distances and (..., P) fuel -> (..., T, W)
+    weapon_distance = distance[..., fleet.weapon_plane]
+    weapon_fuel = fuel[..., fleet.weapon_plane][..., None, :]
+    with np.errstate(divide='ignore'):
+        pg = fleet.weapon_kinematics * fleet.weapon_expiring * (weapon_fuel / 100) / weapon_distance
+    return np.where(weapon_distance <= fleet.weapon_range, pg, 0.0)
+
+def best_pairs(target_pos, plane_pos, distance, sees):
+    # Vectorized select_best_pair: for each target the most orthogonal pair of planes that
+    # see it, or (-1, -1) unless more than two do. Shapes (..., T, 3), (..., P, 3), (..., T, P).
+    planes = distance.shape[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unit = (target_pos[..., :, None, :] - plane_pos[..., None, :, :]) / distance[..., None]
+        cos = np.einsum('...pk,...qk->...pq', unit, unit).clip(-1, 1)
+        score = np.abs(np.degrees(np.arccos(cos)) - 90)
+    valid = sees[..., :, None] & sees[..., None, :] & np.triu(np.ones((planes, planes), dtype=bool), k=1)
+    flat = np.where(valid, score, np.inf).reshape(distance.shape[:-1] + (-1,)).argmin(axis=-1)
+    pairs = np.stack(np.divmod(flat, planes), axis=-1)
+    return np.where((sees.sum(axis=-1) > 2)[..., None], pairs, -1)
+
+def synthetic_fleet(planes, targets, weapons_per_plane=5, seed=0):
+    # Scales generate_data.py's layout up for engagements too large to keep as CSV
+    rng = np.random.default_rng(seed)
+    fleet = FleetArrays([], [])
+    fleet.plane_pos = np.column_stack([rng.uniform(0, 100, (planes, 2)) * planes ** 0.5, rng.uniform(0, 10, planes)])
+    fleet.fuel = rng.uniform(10, 100, planes)
+    fleet.fuel_burn_rate = np.full(planes, 2.0)
+    fleet.plane_ids = np.arange(1, planes + 1)
+    fleet.weapon_plane = np.repeat(np.arange(planes), weapons_per_plane)
+    fleet.weapon_range = rng.choice([100.0, 200.0, 300.0, 400.0, 500.0], planes * weapons_per_plane)
+    fleet.weapon_kinematics = rng.uniform(1, 2, planes * weapons_per_plane)
+    fleet.weapon_expiring = rng.uniform(1, 2, planes * weapons_per_plane)
+    fleet.target_pos = np.column_stack([rng.uniform(0, 100, (targets, 2)) * planes ** 0.5, rng.uniform(10, 100, targets)])
+    fleet.target_ids = np.arange(1, targets + 1)
+    return fleet
@@ -0,0 +1,114 @@
+import random
+import sys
+import time
+
+from wtpmv6 import load_csv, compute_pg
+
+ENGINE_VERSION = 1  # Bump whenever a change to move() or run_tick() alters run results
+
+DEFAULT_PARAMETERS = {
+    'fuel_burn_rate': 2,  # BluePlane.fuel_burn_rate
+    'plane_spread': 20,  # Per-axis jitter of BluePlane.move
+    'target_spread': 25,  # Per-axis jitter of Target.move
+    'range_scale': 1.0,  # Multiplier on every weapon range
+    'max_ticks': 10000,
+}
+
+def move(blue_planes, targets, rng, plane_spread=20, target_spread=25):
+    # BluePlane.move and Target.move without the per-entity log line, drawing from rng
+    for plane in blue_planes:
+        if plane.fuel > 0:
+            plane.position = tuple(c + rng.uniform(-plane_spread, plane_spread) for c in plane.position)
+            plane.fuel = max(plane.fuel - plane.fuel_burn_rate, 0)
+    for target in targets:
+        target.position = tuple(c + rng.uniform(-target_spread, target_spread) for c in target.position)
+
+def run_tick(blue_planes, targets, tick, rng, params=DEFAULT_PARAMETERS, stream=None):
+    # One tick of wtpmv6.main(): move everything, then every target in list order takes the
+    # best positive-PG weapon left. Killed targets leave `targets` in place. With an
+    # events.EventStream the tick also runs the report and pair phases and streams every
+    # change. Returns the planes still fuelled, the (plane, weapon, target, pg) shots fired,
+    # and the move and engage times in ms.
+    start = time.perf_counter()
+    move(blue_planes, targets, rng, params['plane_spread'], params['target_spread'])
+    moved = time.perf_counter()
+    if stream:
+        stream.report(tick, blue_planes, targets)
+
+    shots = []
+    for target in targets[:]:
+        best = None
+        best_pg = 0
+        for plane in sorted(blue_planes, key=lambda p: p.fuel):
+            for weapon in plane.weapons:
+                pg = compute_pg(plane, weapon, target)
+                if pg > best_pg:
+                    best, best_pg = (plane, weapon), pg
+        if best and best[0].fire_weapon(best[1]):
+            targets.remove(target)
+            shots.append((best[0], best[1], target, best_pg))
+            if stream:
+                stream.shot(tick, *shots[-1])
+    engaged = time.perf_counter()
+
+    if stream:
+        stream.end_tick(tick, blue_planes, targets)
+    blue_planes = [plane for plane in blue_planes if plane.fuel > 0]
+    return blue_planes, shots, ((moved - start) * 1000, (engaged - moved) * 1000)
+
+def run_headless(scenario, seed=0, record_ticks=False, on_tick=None, stream=None, **parameters):
+    # main() from wtpmv6 without printing, one run_tick() per tick. Returns compact run
+    # metrics, plus one [tick, kills, pg, fuel, weapons, move_ms, engage_ms] row per tick if
+    # record_ticks. on_tick(tick, blue_planes, targets, shots) sees the state at the end of
+    # every tick; a stream receives its events as in run_tick().
+    params = dict(DEFAULT_PARAMETERS, **parameters)
+    rng = random.Random(seed)
+    blue_planes, targets = load_csv(scenario)
+    for plane in blue_planes:
+        plane.fuel_burn_rate = params['fuel_burn_rate']
+        for weapon in plane.weapons:
+            weapon.range *= params['range_scale']
+    if stream:
+        stream.snapshot(0, blue_planes, targets)
+
+    start = time.perf_counter()
+    total_targets = len(targets)
+    ticks = 0
+    pg_values = []
+    tick_metrics = []
+    while targets and blue_planes and ticks < params['max_ticks']:
+        ticks += 1
+        blue_planes, shots, (move_ms, engage_ms) = run_tick(blue_planes, targets, ticks, rng, params, stream)
+        pg_values.extend(shot[3] for shot in shots)
+        if record_ticks:
+            tick_metrics.append([ticks, len(shots), sum(shot[3] for shot in shots),
+                                 sum(plane.fuel for plane in blue_planes),
+                                 sum(len(plane.weapons) for plane in blue_planes), move_ms, engage_ms])
+        if on_tick:
+            on_tick(ticks, blue_planes, targets, shots)
+
+    result = {
+        'ticks': ticks,
+        'kills': total_targets - len(targets),
+        'targets_left': len(targets),
+        'planes_left': len(blue_planes),
+        'fuel_left': sum(plane.fuel for plane in blue_planes),
+        'weapons_left': sum(len(plane.weapons) for plane in blue_planes),
+        'pg_total': sum(pg_values),
+        'pg_mean': sum(pg_values) / len(pg_values) if pg_values else 0.0,
+        'pg_min': min(pg_values, default=0.0),
+        'pg_max': max(pg_values, default=0.0),
+        'elapsed': time.perf_counter() - start,
+    }
+    if record_ticks:
+        result['tick_metrics'] = tick_metrics
+    return result
+
+def main():
+    scenario = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d_beastmode.csv'
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    for name, value in run_headless(scenario, seed).items():
+        print(f"{name}: {value}")
+
+if __name__ == "__main__":
+    main()
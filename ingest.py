@@ -0,0 +1,222 @@
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from batch_sim import BatchEngine
+from fleet import synthetic_fleet
+
+def parse_row(line):
+    # "x,y,z" or "id,x,y,z" -> (id or None, x, y, z); None for anything else
+    try:
+        values = [float(v) for v in line.split(',')]
+    except ValueError:
+        return None
+    if len(values) == 3:
+        return (None, *values)
+    if len(values) == 4:
+        return (int(values[0]), *values[1:])
+    return None
+
+def poisson_waves(rate, bounds=((0, 1000), (0, 1000), (10, 100)), seed=0):
+    # Endless raid generator: one batch of new target rows per tick, Poisson(rate) in size,
+    # uniform over the arena
+    rng = np.random.default_rng(seed)
+    lo, hi = np.array(bounds, dtype=float).T
+    while True:
+        yield [(None, *row) for row in rng.uniform(lo, hi, (rng.poisson(rate), 3)).tolist()]
+
+class IterableSource:
+    # Any iterable of per-tick batches, e.g. poisson_waves(); one batch is taken per poll and
+    # whatever does not fit under the limit waits for the next one
+    def __init__(self, batches):
+        self.batches = iter(batches)
+        self.carry = deque()
+
+    def poll(self, limit):
+        if len(self.carry) < limit:
+            self.carry.extend(next(self.batches, ()))
+        return [self.carry.popleft() for _ in range(min(limit, len(self.carry)))]
+
+class FileTail:
+    # Rows appended to a text file by another process; a line is only taken once complete
+    def __init__(self, path):
+        self.file = open(path, 'a+')
+        self.file.seek(0)
+        self.partial = ''
+        self.rejected = 0
+
+    def poll(self, limit):
+        rows = []
+        while len(rows) < limit:
+            line = self.file.readline()
+            if not line:
+                break
+            if not line.endswith('\n'):
+                self.partial += line  # Writer is mid-line; finish it next poll
+                break
+            row = parse_row(self.partial + line)
+            self.partial = ''
+            if row:
+                rows.append(row)
+            else:
+                self.rejected += 1
+        return rows
+
+    def close(self):
+        self.file.close()
+
+class _RowHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            row = parse_row(line.decode())
+            while row and not self.server.closed.is_set():
+                try:
+                    self.server.rows.put(row, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass  # Not reading leaves the rest of the burst in the feeder's socket
+            if self.server.closed.is_set():
+                return
+
+class SocketSource:
+    # TCP listener: any number of feeders send one row per line. A background thread does the
+    # blocking reads; poll() only drains what has already arrived. Reading stops while
+    # max_pending rows are waiting, so a burst backs up into the feeders' sockets.
+    def __init__(self, host='127.0.0.1', port=0, max_pending=1024):
+        self.server = socketserver.ThreadingTCPServer((host, port), _RowHandler)
+        self.server.daemon_threads = True
+        self.server.rows = queue.Queue(maxsize=max_pending)
+        self.server.closed = threading.Event()
+        self.address = self.server.server_address
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def poll(self, limit):
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self.server.rows.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def close(self):
+        self.server.closed.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+class TargetIngest:
+    # Collects arrivals from every source between ticks and admits at most max_batch of them
+    # per tick, oldest first. Sources are only polled while the backlog has room, so a burst
+    # waits in its source instead of stalling a tick; latency is counted in ticks queued.
+    def __init__(self, sources, max_batch=256, max_backlog=4096, first_id=1):
+        self.sources = sources
+        self.max_batch = max_batch
+        self.max_backlog = max_backlog
+        self.next_id = first_id
+        self.backlog = deque()  # (arrival tick, id, x, y, z)
+        self.admitted = 0
+        self.latency_total = 0
+        self.latency_max = 0
+
+    def admit(self, tick):
+        for source in self.sources:
+            for target_id, x, y, z in source.poll(self.max_backlog - len(self.backlog)):
+                if target_id is None:
+                    target_id = self.next_id
+                self.next_id = max(self.next_id, target_id + 1)
+                self.backlog.append((tick, target_id, x, y, z))
+        batch = [self.backlog.popleft() for _ in range(min(self.max_batch, len(self.backlog)))]
+        if not batch:
+            return np.empty(0, dtype=np.int64), np.empty((0, 3))
+        rows = np.array(batch, dtype=float)
+        latency = tick - rows[:, 0]
+        self.admitted += len(batch)
+        self.latency_total += latency.sum()
+        self.latency_max = max(self.latency_max, int(latency.max()))
+        return rows[:, 1].astype(np.int64), rows[:, 2:]
+
+class StreamingEngine(BatchEngine):
+    # A single run of BatchEngine that keeps going while planes last and takes new targets
+    # every tick. Arrivals fill the slots of killed targets first; the target arrays only
+    # grow, by doubling, when none are free.
+    def __init__(self, fleet, ingest, seed=None, sensor_range=np.inf):
+        super().__init__(fleet, 1, seed, sensor_range)
+        self.ingest = ingest
+        self.target_ids = np.array(fleet.target_ids, dtype=np.int64)
+        # Arrivals without an id are numbered past the fleet's own targets
+        ingest.next_id = max(ingest.next_id, int(self.target_ids.max(initial=0)) + 1)
+        self.tick = 0
+
+    def active(self):
+        return self.plane_alive.any(axis=1)
+
+    def admit(self, ids, positions):
+        free = np.flatnonzero(~self.target_alive[0])
+        if len(free) < len(ids):
+            self._grow(self.target_alive.shape[1] + len(ids) - len(free))
+            free = np.flatnonzero(~self.target_alive[0])
+        slots = free[:len(ids)]
+        self.target_ids[slots] = ids
+        self.target_pos[0, slots] = positions
+        self.target_alive[0, slots] = True
+        self.pairs[0, slots] = -1
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * self.target_alive.shape[1], 64)
+        extra = capacity - self.target_alive.shape[1]
+        self.target_ids = np.concatenate([self.target_ids, np.zeros(extra, dtype=np.int64)])
+        self.target_pos = np.concatenate([self.target_pos, np.zeros((1, extra, 3))], axis=1)
+        self.target_alive = np.concatenate([self.target_alive, np.zeros((1, extra), dtype=bool)], axis=1)
+        self.pairs = np.concatenate([self.pairs, np.full((1, extra, 2), -1)], axis=1)
+
+    def step(self):
+        self.tick += 1
+        ids, positions = self.ingest.admit(self.tick)
+        if len(ids):
+            self.admit(ids, positions)
+        return super().step()
+
+def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    fleet = synthetic_fleet(100, 0, weapons_per_plane=100)
+    fleet.fuel *= 1000  # Planes stay up for the whole soak
+    tail_path = 'waves.csv'
+    with open(tail_path, 'w') as f:
+        f.write(''.join(f"{x:.1f},{y:.1f},50\n" for x, y in np.random.default_rng(1).uniform(0, 1000, (100, 2))))
+    tail = FileTail(tail_path)
+    feed = SocketSource()
+    ingest = TargetIngest([IterableSource(poisson_waves(rate)), tail, feed], max_batch=int(rate * 2))
+    engine = StreamingEngine(fleet, ingest, seed=0, sensor_range=300)
+
+    with socket.create_connection(feed.address) as conn:
+        conn.sendall(b''.join(b"500,500,%d\n" % z for z in range(20, 70)))
+    tick_ms = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        if not engine.step():
+            break
+        tick_ms.append((time.perf_counter() - start) * 1000)
+    tail.close()
+    feed.close()
+    os.remove(tail_path)
+
+    tick_ms = np.array(tick_ms)
+    print(f"{engine.tick} ticks at {rate:g} arrivals per tick: {ingest.admitted} admitted, "
+          f"{len(ingest.backlog)} still queued, {int(engine.kills[0])} kills, "
+          f"{int(engine.target_alive.sum())} targets alive in {engine.target_alive.shape[1]} slots")
+    print(f"Admission latency: mean {ingest.latency_total / max(ingest.admitted, 1):.2f} ticks, "
+          f"max {ingest.latency_max}")
+    print(f"Tick time: mean {tick_ms.mean():.2f} ms, p99 {np.percentile(tick_ms, 99):.2f} ms, "
+          f"last 50 mean {tick_ms[-50:].mean():.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import sys
+import time
+
+import numpy as np
+
+from batch_sim import BatchEngine
+from coverage import PLANE_MAX_STEP, TARGET_MAX_STEP
+from fleet import FleetArrays, synthetic_fleet
+
+# Per-tick limits. Top speeds stay under the largest jitter step of BluePlane.move and
+# Target.move, so the displacement bounds VerletCoverage and TopKPGCache rely on still hold.
+PLANE_MOTION = {'min_speed': 8, 'max_speed': 30, 'max_accel': 3, 'max_turn': np.radians(15),
+                'max_pitch': np.radians(20), 'max_pitch_rate': np.radians(5)}
+TARGET_MOTION = {'min_speed': 5, 'max_speed': 40, 'max_accel': 4, 'max_turn': np.radians(25),
+                 'max_pitch': np.radians(30), 'max_pitch_rate': np.radians(8)}
+assert PLANE_MOTION['max_speed'] <= PLANE_MAX_STEP and TARGET_MOTION['max_speed'] <= TARGET_MAX_STEP
+
+def arena_bounds(fleet, margin=500, ceiling=200):
+    # Box around the scenario's starting positions; altitude is floored at zero
+    points = np.concatenate([fleet.plane_pos.reshape(-1, 3), fleet.target_pos.reshape(-1, 3)])
+    lo = np.append(points[:, :2].min(axis=0) - margin, 0)
+    hi = np.append(points[:, :2].max(axis=0) + margin, max(points[:, 2].max(), ceiling))
+    return lo, hi
+
+class MotionModel:
+    # Heading, climb angle and speed per entity (any leading batch axes), advanced for every
+    # entity in one array update. Random turn, climb and throttle commands are drawn in bulk
+    # and clipped to the turn-rate, pitch-rate and acceleration limits; an entity that hits
+    # an arena wall is clamped to it and turned back, so none leaves the box or goes below ground.
+    def __init__(self, positions, bounds, rng, min_speed, max_speed, max_accel, max_turn, max_pitch,
+                 max_pitch_rate):
+        shape = positions.shape[:-1]
+        self.lo, self.hi = (np.asarray(b, dtype=float) for b in bounds)
+        self.rng = rng
+        self.min_speed, self.max_speed, self.max_accel = min_speed, max_speed, max_accel
+        self.max_turn, self.max_pitch, self.max_pitch_rate = max_turn, max_pitch, max_pitch_rate
+        self.heading = rng.uniform(-np.pi, np.pi, shape)
+        self.pitch = np.zeros(shape)
+        self.speed = rng.uniform(min_speed, max_speed, shape)
+
+    def velocity(self):
+        horizontal = self.speed * np.cos(self.pitch)
+        return np.stack([horizontal * np.cos(self.heading), horizontal * np.sin(self.heading),
+                         self.speed * np.sin(self.pitch)], axis=-1)
+
+    def step(self, positions, moving):
+        # Updates positions in place where moving is set; others keep position and state
+        turn, climb, throttle = self.rng.standard_normal((3,) + moving.shape) / 2
+        limits = ((turn, self.max_turn), (climb, self.max_pitch_rate), (throttle, self.max_accel))
+        turn, climb, throttle = (np.clip(c * limit, -limit, limit) * moving for c, limit in limits)
+        self.heading = (self.heading + turn + np.pi) % (2 * np.pi) - np.pi
+        self.pitch = np.clip(self.pitch + climb, -self.max_pitch, self.max_pitch)
+        self.speed = np.clip(self.speed + throttle, self.min_speed, self.max_speed)
+
+        moved = np.where(moving[..., None], positions + self.velocity(), positions)
+        clamped = np.clip(moved, self.lo, self.hi)
+        hit = clamped != moved
+        # Reflect off walls: x flips the heading across the y axis, y negates it, z levels off
+        self.heading = np.where(hit[..., 0], np.pi - self.heading, self.heading)
+        self.heading = np.where(hit[..., 1], -self.heading, self.heading)
+        self.pitch = np.where(hit[..., 2], -self.pitch, self.pitch)
+        positions[...] = clamped
+        return positions
+
+class KinematicEngine(BatchEngine):
+    # BatchEngine with MotionModel movement in place of per-axis uniform jitter
+    def __init__(self, fleet, batch, seed=None, sensor_range=np.inf, bounds=None,
+                 plane_motion=PLANE_MOTION, target_motion=TARGET_MOTION):
+        super().__init__(fleet, batch, seed, sensor_range)
+        if bounds is None:
+            bounds = arena_bounds(fleet)
+        self.plane_pos = np.clip(self.plane_pos, *bounds)
+        self.target_pos = np.clip(self.target_pos, *bounds)
+        self.plane_motion = MotionModel(self.plane_pos, bounds, self.rng, **plane_motion)
+        self.target_motion = MotionModel(self.target_pos, bounds, self.rng, **target_motion)
+
+    def move(self, active):
+        moving = active[:, None] & self.plane_alive & (self.fuel > 0)
+        self.plane_motion.step(self.plane_pos, moving)
+        self.fuel = np.where(moving, np.maximum(self.fuel - self.fleet.fuel_burn_rate, 0), self.fuel)
+        self.target_motion.step(self.target_pos, active[:, None] & self.target_alive)
+
+def main():
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d_beastmode.csv'
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    fleet = FleetArrays.from_csv(filename)
+    fleet.weapon_range *= 0.1  # Short enough that runs last more than one tick
+    for engine_class in (BatchEngine, KinematicEngine):
+        start = time.perf_counter()
+        engine = engine_class(fleet, batch, seed=0).run()
+        elapsed = time.perf_counter() - start
+        lowest = min(engine.plane_pos[..., 2].min(), engine.target_pos[..., 2].min())
+        print(f"{engine_class.__name__}: {batch} replications in {elapsed:.2f} s, mean ticks {engine.ticks.mean():.2f}, "
+              f"mean kills {engine.kills.mean():.2f}, lowest altitude {lowest:.1f}")
+
+    # Movement alone for a large fleet, the stage BluePlane.move and Target.move do one entity at a time
+    fleet = synthetic_fleet(1000, 100000)
+    engine = KinematicEngine(fleet, 1, seed=0)
+    active = np.ones(1, dtype=bool)
+    start = time.perf_counter()
+    for _ in range(100):
+        engine.move(active)
+    elapsed = (time.perf_counter() - start) / 100
+    lo, hi = engine.target_motion.lo, engine.target_motion.hi
+    inside = ((engine.target_pos >= lo) & (engine.target_pos <= hi)).all()
+    print(f"Moved {len(fleet.plane_ids)} planes and {len(fleet.target_ids)} targets in {elapsed * 1000:.1f} ms per tick, "
+          f"all inside the arena: {inside}")
+    _, targets = fleet.to_objects()
+    start = time.perf_counter()
+    for target in targets:
+        target.move()
+    print(f"Target.move over the same targets: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
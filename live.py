@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+from multiprocessing import Process, shared_memory
+
+import numpy as np
+
+from headless import run_headless
+from wtpmv6 import load_csv
+
+def slot_dtype(max_planes, max_targets):
+    return np.dtype([('seq', '<i8'), ('tick', '<i8'), ('planes', '<i8'), ('targets', '<i8'),
+                     ('plane_ids', '<i8', (max_planes,)), ('plane_pos', '<f8', (max_planes, 3)),
+                     ('target_pos', '<f8', (max_targets, 3))])
+
+class FrameRing:
+    # Fixed-size ring of per-tick snapshots in one shared memory block. The simulation is the
+    # only writer and never waits: publish() overwrites the oldest slot. Each slot carries the
+    # sequence number it was written under (-1 while being written), so a reader that copied
+    # a slot mid-overwrite sees the mismatch and drops that frame instead of drawing it torn.
+    def __init__(self, block, slots, max_planes, max_targets, owner):
+        self.block = block
+        self.slots = slots
+        self.max_planes = max_planes
+        self.max_targets = max_targets
+        self.owner = owner
+        self.control = np.ndarray(2, dtype='<i8', buffer=block.buf)  # latest sequence, done flag
+        self.ring = np.ndarray(slots, dtype=slot_dtype(max_planes, max_targets), buffer=block.buf,
+                               offset=self.control.nbytes)
+
+    @classmethod
+    def create(cls, max_planes, max_targets, slots=8):
+        size = 16 + slots * slot_dtype(max_planes, max_targets).itemsize
+        block = shared_memory.SharedMemory(create=True, size=size)
+        ring = cls(block, slots, max_planes, max_targets, owner=True)
+        ring.control[:] = 0
+        ring.ring['seq'] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, spec):
+        name, slots, max_planes, max_targets = spec
+        return cls(shared_memory.SharedMemory(name=name), slots, max_planes, max_targets, owner=False)
+
+    @property
+    def spec(self):
+        return self.block.name, self.slots, self.max_planes, self.max_targets
+
+    @property
+    def done(self):
+        return bool(self.control[1])
+
+    def finish(self):
+        self.control[1] = 1
+
+    def publish(self, tick, plane_ids, plane_pos, target_pos):
+        # Entities past the ring's capacity are cut off rather than resizing shared memory
+        seq = int(self.control[0]) + 1
+        slot = self.ring[seq % self.slots]
+        planes = min(len(plane_ids), self.max_planes)
+        targets = min(len(target_pos), self.max_targets)
+        slot['seq'] = -1
+        slot['tick'] = tick
+        slot['planes'] = planes
+        slot['targets'] = targets
+        if planes:
+            slot['plane_ids'][:planes] = plane_ids[:planes]
+            slot['plane_pos'][:planes] = np.asarray(plane_pos, dtype=float).reshape(-1, 3)[:planes]
+        if targets:
+            slot['target_pos'][:targets] = np.asarray(target_pos, dtype=float).reshape(-1, 3)[:targets]
+        slot['seq'] = seq
+        self.control[0] = seq
+        return seq
+
+    def latest(self, last_seen=0):
+        # Newest frame as (seq, tick, plane_ids, plane_pos, target_pos), or None if nothing
+        # newer than last_seen has been published or the slot was overwritten while copying
+        seq = int(self.control[0])
+        if seq == last_seen:
+            return None
+        slot = self.ring[seq % self.slots].copy()
+        if slot['seq'] != seq or self.ring[seq % self.slots]['seq'] != seq:
+            return None
+        planes, targets = int(slot['planes']), int(slot['targets'])
+        return seq, int(slot['tick']), slot['plane_ids'][:planes], slot['plane_pos'][:planes], slot['target_pos'][:targets]
+
+    def close(self):
+        self.control = self.ring = None  # Drop the views before releasing the buffer
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+def publisher(ring, tick_interval=0):
+    # on_tick hook for run_headless that copies each tick's positions into the ring; a
+    # tick_interval paces the run to wall-clock time so there is something to watch
+    def on_tick(tick, blue_planes, targets, shots):
+        ring.publish(tick, [plane.id for plane in blue_planes], [plane.position for plane in blue_planes],
+                     [target.position for target in targets])
+        if tick_interval:
+            time.sleep(tick_interval)
+    return on_tick
+
+def run_viewer(spec, refresh_hz=10, out=None):
+    # Redraws the newest frame at a fixed rate until the simulation finishes. Frames published
+    # between two refreshes are skipped. With out set it renders offscreen, saving each redraw there.
+    import matplotlib
+    if out:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from plot_locations import draw_positions
+
+    ring = FrameRing.attach(spec)
+    fig = plt.figure(figsize=(10, 7))
+    ax = fig.add_subplot(111, projection='3d')
+    last_seen = 0
+    drawn = 0
+    while True:
+        finished = ring.done
+        frame = ring.latest(last_seen)
+        if frame:
+            last_seen, tick, plane_ids, plane_pos, target_pos = frame
+            ax.cla()
+            draw_positions(ax, plane_pos, target_pos, plane_ids)
+            ax.set_title(f'Tick {tick}: {len(plane_ids)} planes, {len(target_pos)} targets')
+            drawn += 1
+            if out:
+                fig.savefig(out, dpi=80)
+        if finished and (frame is None or last_seen == int(ring.control[0])):
+            break
+        if out:
+            time.sleep(1 / refresh_hz)
+        else:
+            plt.pause(1 / refresh_hz)
+    print(f"Viewer drew {drawn} of {last_seen} frames")
+    ring.close()
+
+def main():
+    scenario = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d_beastmode.csv'
+    tick_interval = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    out = sys.argv[3] if len(sys.argv) > 3 else (None if os.environ.get('DISPLAY') else 'live.png')
+    blue_planes, targets = load_csv(scenario)
+    ring = FrameRing.create(len(blue_planes), len(targets))
+    viewer = Process(target=run_viewer, args=(ring.spec, 10, out))
+    viewer.start()
+
+    start = time.perf_counter()
+    result = run_headless(scenario, 0, range_scale=0.1, on_tick=publisher(ring, tick_interval))
+    elapsed = time.perf_counter() - start
+    ring.finish()
+    print(f"Simulation published {result['ticks']} ticks in {elapsed:.2f} s ({result['kills']} kills)")
+    viewer.join()
+    ring.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import copy
+import sys
+import time
+
+import numpy as np
+
+from fleet import distance_matrix, pg_matrix, best_pairs, synthetic_fleet
+from kinematics import KinematicEngine
+
+WEAPON_SPEED = 50  # Distance a weapon covers per tick
+
+def propagate(positions, velocity, steps, bounds=None):
+    # Constant-velocity prediction for every target at once: (..., T, 3) -> (steps + 1, ..., T, 3),
+    # row 0 being the current positions. Predictions stop at the arena walls.
+    offsets = np.arange(steps + 1).reshape((-1,) + (1,) * positions.ndim)
+    path = positions + offsets * velocity
+    return np.clip(path, *bounds) if bounds is not None else path
+
+class Lookahead:
+    # Per-tick cache of predicted target paths and of the intercept geometry derived from them,
+    # so the PG and pairing phases of one tick share a single propagation. A weapon launched
+    # now meets its target after about distance / weapon_speed ticks (capped at the horizon);
+    # the intercept step is estimated from the current distance, then refined once against
+    # the predicted position at that step.
+    def __init__(self, horizon=10, weapon_speed=WEAPON_SPEED):
+        self.horizon = horizon
+        self.weapon_speed = weapon_speed
+        self.tick = None
+        self.path = None
+        self.intercepts = None
+
+    def predict(self, tick, positions, velocity, bounds=None):
+        if tick != self.tick:
+            self.tick = tick
+            self.path = propagate(positions, velocity, self.horizon, bounds)
+            self.intercepts = None
+        return self.path
+
+    def positions_at(self, step):
+        return self.path[min(step, self.horizon)]
+
+    def intercept(self, plane_pos):
+        # (..., T, P) distances at the predicted intercept and the step each happens at
+        if self.intercepts is None:
+            path = np.moveaxis(self.path, 0, -2)  # (..., T, horizon + 1, 3)
+            distance = distance_matrix(self.path[0], plane_pos)
+            for _ in range(2):
+                step = np.minimum(np.ceil(distance / self.weapon_speed), self.horizon).astype(np.intp)
+                meet = np.take_along_axis(path, step[..., None], axis=-2)  # (..., T, P, 3)
+                distance = np.linalg.norm(meet - plane_pos[..., None, :, :], axis=-1)
+            self.intercepts = distance, step
+        return self.intercepts
+
+class LookaheadEngine(KinematicEngine):
+    # KinematicEngine that scores weapons at predicted intercept geometry instead of current
+    # positions, and pairs sensors on where targets will be next tick
+    def __init__(self, fleet, batch, seed=None, sensor_range=np.inf, bounds=None, horizon=10,
+                 weapon_speed=WEAPON_SPEED):
+        super().__init__(fleet, batch, seed, sensor_range, bounds)
+        self.lookahead = Lookahead(horizon, weapon_speed)
+        self.bounds = (self.target_motion.lo, self.target_motion.hi)
+
+    def predict(self):
+        self.lookahead.predict(int(self.ticks.max()), self.target_pos, self.target_motion.velocity(), self.bounds)
+        return self.lookahead
+
+    def step(self):
+        active = self.active()
+        if not active.any():
+            return False
+        self.move(active)
+        self.ticks += active
+        lookahead = self.predict()
+        next_pos = lookahead.positions_at(1)
+        next_distance = distance_matrix(next_pos, self.plane_pos)
+        sees = (next_distance <= self.sensor_range) & self.plane_alive[:, None, :] & self.target_alive[..., None]
+        self.pairs = best_pairs(next_pos, self.plane_pos, next_distance, sees)
+        distance, _ = lookahead.intercept(self.plane_pos)
+        pg = pg_matrix(distance, self.fuel, self.fleet)
+        live = active[:, None, None] & self.target_alive[..., None] & self.weapon_alive[:, None, :]
+        self.engage(np.where(live, pg, 0))
+        self.plane_alive &= self.fuel > 0  # Remove planes with zero fuel
+        return True
+
+def realized_pg(engine, choices, true_path):
+    # PG each (target, weapon) choice actually achieves against where the target really went
+    truth = Lookahead(engine.lookahead.horizon, engine.lookahead.weapon_speed)
+    truth.path = true_path
+    distance, _ = truth.intercept(engine.plane_pos)
+    pg = pg_matrix(distance, engine.fuel, engine.fleet)
+    return np.take_along_axis(pg, choices[..., None], axis=-1)[..., 0]
+
+def main():
+    batch = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    fleet = synthetic_fleet(40, 500, seed=0)
+    engine = LookaheadEngine(fleet, batch, seed=0)
+    engine.move(engine.active())
+    engine.ticks += 1
+
+    start = time.perf_counter()
+    current = pg_matrix(distance_matrix(engine.target_pos, engine.plane_pos), engine.fuel, fleet)
+    naive_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    distance, _ = engine.predict().intercept(engine.plane_pos)
+    ahead = pg_matrix(distance, engine.fuel, fleet)
+    ahead_ms = (time.perf_counter() - start) * 1000
+
+    # Ground truth: let the targets keep manoeuvring (random turns included) over the horizon
+    truth = copy.deepcopy(engine.target_motion)
+    positions = engine.target_pos.copy()
+    path = [positions.copy()]
+    for _ in range(engine.lookahead.horizon):
+        path.append(truth.step(positions, engine.target_alive).copy())
+    path = np.stack(path)
+
+    for name, pg in (('Current geometry', current), ('Look-ahead', ahead)):
+        choices = pg.argmax(axis=-1)
+        scored = np.take_along_axis(pg, choices[..., None], axis=-1)[..., 0]
+        achieved = realized_pg(engine, choices, path)
+        print(f"{name}: predicted PG {scored.mean():.4f}, realized PG {achieved.mean():.4f}, "
+              f"shots that miss the envelope {((achieved == 0) & (scored > 0)).mean():.1%}")
+    print(f"PG matrix for {batch} x {len(fleet.target_ids)} targets: {naive_ms:.1f} ms at current positions, "
+          f"{ahead_ms:.1f} ms with a {engine.lookahead.horizon}-step look-ahead")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import itertools
+
+from wtpmv6 import load_csv, angle_between, move_entities, ensure_make_before_break_handoff
+from coverage import VerletCoverage, max_weapon_range
+
+def pair_score(s1, s2, target):
+    return abs(angle_between(s1, s2, target) - 90)
+
+def best_pair(sensors, target):
+    # Same choice as select_best_pair without the log line
+    best = None
+    best_score = float('inf')
+    for s1, s2 in itertools.combinations(sensors, 2):
+        score = pair_score(s1, s2, target)
+        if score < best_score:
+            best_score = score
+            best = (s1, s2)
+    return best, best_score
+
+class WarmPairing:
+    # Carries each target's sensor pair across ticks and re-runs the O(S^2) search only
+    # when a sensor stopped reporting or the pair drifted more than `tolerance` degrees off 90
+    def __init__(self, tolerance=5.0):
+        self.tolerance = tolerance
+        self.pairs = {}  # target -> (sensor, sensor)
+        self.reused = 0
+        self.recomputed = 0
+
+    def select(self, sensors, target):
+        previous = self.pairs.get(target)
+        if previous and previous[0] in sensors and previous[1] in sensors:
+            if pair_score(previous[0], previous[1], target) <= self.tolerance:
+                self.reused += 1
+                return previous
+        pair, _ = best_pair(sensors, target)
+        self.recomputed += 1
+        if pair:
+            self.pairs[target] = pair
+        else:
+            self.pairs.pop(target, None)
+        return pair
+
+    def forget(self, target):
+        self.pairs.pop(target, None)
+
+def main():
+    blue_planes, targets = load_csv('input_data_3d_beastmode.csv')
+    coverage = VerletCoverage(max_weapon_range(blue_planes))
+    pairing = WarmPairing()
+    tick = 0
+
+    while tick < 20 and blue_planes:
+        move_entities(blue_planes, targets)
+        coverage.update(blue_planes, targets)
+        tick += 1
+        for target in targets:
+            previous = pairing.pairs.get(target)
+            pair = pairing.select(coverage.planes_in_range(target), target)
+            if previous and pair:
+                # Hand each sensor that left the pair to one that joined it
+                joined = [plane for plane in pair if plane not in previous]
+                for old, new in zip([plane for plane in previous if plane not in pair], joined):
+                    ensure_make_before_break_handoff((old, target), (new, target))
+        blue_planes = [plane for plane in blue_planes if plane.fuel > 0]
+
+    print(f"\nPairs reused {pairing.reused} times, recomputed {pairing.recomputed} times over {tick} ticks")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import sys
+
+from wtpmv6 import load_csv, distance_3d, compute_pg, move_entities
+from coverage import PLANE_MAX_STEP, TARGET_MAX_STEP
+
+def pg_upper_bound(pg_scale, distance, weapon_range, drift):
+    # pg_scale is kinematics * expiring_factor * fuel / 100 when cached; fuel only burns down,
+    # so the PG can only grow by the pair closing in by at most `drift`
+    closest = distance - drift
+    if closest > weapon_range:
+        return 0
+    if closest <= 0:
+        return float('inf')
+    return pg_scale / closest
+
+class TargetCache:
+    def __init__(self, candidates, rest_bound, position, plane_drift):
+        self.candidates = candidates  # list of (plane, weapon, pg_scale, distance)
+        self.rest_bound = rest_bound  # PG bound for every (plane, weapon) left out of the cache
+        self.position = position  # target position when cached
+        self.plane_drift = plane_drift  # cumulative plane drift when cached
+
+class TopKPGCache:
+    def __init__(self, k=5, max_drift=PLANE_MAX_STEP + TARGET_MAX_STEP):
+        self.k = k
+        self.max_drift = max_drift
+        self.caches = {}  # target -> TargetCache
+        self.weapon_index = {}  # weapon -> targets whose cache holds it
+        self.plane_positions = {}  # plane -> position at the last advance
+        self.plane_drift = 0  # sum over ticks of the largest plane step
+        self.hits = 0
+        self.rebuilds = 0
+        self.evaluations = 0
+
+    def advance(self, blue_planes):
+        # Call once per tick after movement; bounds every plane's displacement in O(P)
+        step = 0
+        for plane in blue_planes:
+            last = self.plane_positions.get(plane)
+            if last is not None:
+                step = max(step, distance_3d(last, plane.position))
+            self.plane_positions[plane] = plane.position
+        self.plane_drift += step
+
+    def best(self, target, blue_planes):
+        cache = self.caches.get(target)
+        if cache is None:
+            return self.rebuild(target, blue_planes)
+        drift = distance_3d(cache.position, target.position) + self.plane_drift - cache.plane_drift
+        if drift > self.max_drift:
+            return self.rebuild(target, blue_planes)
+
+        bounded = sorted(((pg_upper_bound(scale, distance, weapon.range, drift), plane, weapon)
+                          for plane, weapon, scale, distance in cache.candidates),
+                         key=lambda c: c[0], reverse=True)
+        best_pg = 0
+        best_plane = best_weapon = None
+        for bound, plane, weapon in bounded:
+            if bound <= best_pg:
+                break
+            pg = compute_pg(plane, weapon, target)
+            self.evaluations += 1
+            if pg > best_pg:
+                best_pg, best_plane, best_weapon = pg, plane, weapon
+
+        if best_pg < cache.rest_bound:
+            return self.rebuild(target, blue_planes)
+        self.hits += 1
+        return best_plane, best_weapon
+
+    def rebuild(self, target, blue_planes):
+        self.discard(target)
+        scored = []
+        best_pg = 0
+        best_plane = best_weapon = None
+        for plane in sorted(blue_planes, key=lambda p: p.fuel):  # Same tie order as select_best_weapon
+            distance = distance_3d(plane.position, target.position)
+            for weapon in plane.weapons:
+                scale = weapon.kinematics * weapon.expiring_factor * (plane.fuel / 100)
+                self.evaluations += 1
+                if distance <= weapon.range:
+                    pg = scale / distance
+                    if pg > best_pg:
+                        best_pg, best_plane, best_weapon = pg, plane, weapon
+                bound = pg_upper_bound(scale, distance, weapon.range, self.max_drift)
+                scored.append((bound, plane, weapon, scale, distance))
+
+        scored.sort(key=lambda c: c[0], reverse=True)
+        kept = [(plane, weapon, scale, distance) for _, plane, weapon, scale, distance in scored[:self.k]]
+        rest_bound = scored[self.k][0] if len(scored) > self.k else 0
+        self.caches[target] = TargetCache(kept, rest_bound, target.position, self.plane_drift)
+        for _, weapon, _, _ in kept:
+            self.weapon_index.setdefault(weapon, set()).add(target)
+        self.rebuilds += 1
+        return best_plane, best_weapon
+
+    def discard(self, target):
+        cache = self.caches.pop(target, None)
+        if cache:
+            for _, weapon, _, _ in cache.candidates:
+                self.weapon_index.get(weapon, set()).discard(target)
+
+    def evict_weapon(self, weapon):
+        for target in self.weapon_index.pop(weapon, set()):
+            cache = self.caches[target]
+            cache.candidates = [c for c in cache.candidates if c[1] is not weapon]
+
+    def evict_plane(self, plane):
+        for weapon in plane.weapons:
+            self.evict_weapon(weapon)
+        self.plane_positions.pop(plane, None)
+
+    def invalidate(self):
+        # Planes or weapons were added; cached bounds no longer cover them
+        self.caches = {}
+        self.weapon_index = {}
+
+def main():
+    blue_planes, targets = load_csv('input_data_3d_beastmode.csv')
+    # At full range every target dies on the first tick, before the cache is ever reused
+    range_scale = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    for plane in blue_planes:
+        for weapon in plane.weapons:
+            weapon.range *= range_scale
+    cache = TopKPGCache()
+    tick = 0
+
+    while targets and blue_planes:
+        move_entities(blue_planes, targets)
+        cache.advance(blue_planes)
+        tick += 1
+
+        for target in targets[:]:
+            best_plane, best_weapon = cache.best(target, blue_planes)
+            if best_plane and best_weapon and best_plane.fire_weapon(best_weapon):
+                cache.evict_weapon(best_weapon)
+                cache.discard(target)
+                targets.remove(target)
+                print(f"Target {target.id} shot down by Plane {best_plane.id} with weapon range {best_weapon.range} km")
+
+        for plane in blue_planes:
+            if plane.fuel <= 0:
+                cache.evict_plane(plane)
+        blue_planes = [plane for plane in blue_planes if plane.fuel > 0]
+
+    print(f"\nFinished after {tick} ticks: {cache.hits} cache hits, {cache.rebuilds} rebuilds, "
+          f"{cache.evaluations} PG evaluations")
+
+if __name__ == "__main__":
+    main()
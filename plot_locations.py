@@ -1,101 +1,74 @@
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import argparse
 
-# Data for the planes
-blue_planes = [
-    (1, 75.33254682025849, 80.71886382838223, 9.05301401263568),
-    (2, 32.23193798582611, 70.13025907223121, 9.465577601411931),
-    (3, 9.242855823020047, 88.73122329531982, 7.588786040171196),
-    (4, 35.65089552666092, 6.7553046688847544, 6.967848448962547),
-    (5, 80.38789281714932, 23.316401380299634, 5.5513903034592404),
-    (6, 16.460100450197213, 38.1922221815489, 1.8876482220403457),
-    (7, 21.198605658808447, 92.37415451805907, 9.32396886729224),
-    (8, 13.709102617886881, 30.718373180375547, 3.9893268915547586),
-    (9, 41.717852429660915, 55.77126560822706, 6.483003890159106),
-    (10, 68.39911694787833, 2.6532680313318235, 9.776751507579581)
-]
+import matplotlib
+import numpy as np
 
+from wtpmv6 import load_csv
 
-# Red planes positions
-red_planes = [
-    [1, 28.556259614687306, 45.65542557477479, 82.7182119982024],
-    [2, 27.490864655247393, 36.944013660440945, 15.973274549792471],
-    [3, 53.55616661233819, 58.141994238004116, 39.27768928654931],
-    [4, 64.12900491078074, 48.735126774207686, 54.63448368911769],
-    [5, 25.325022439179044, 24.688563074313098, 56.02109420273007],
-    [6, 89.18730765388024, 18.067838485614484, 90.9339336858697],
-    [7, 57.57582536744595, 71.31458036221872, 52.48353854996772],
-    [8, 69.00406916324727, 13.469936937098826, 45.96303612387111],
-    [9, 52.06040342358238, 84.00989327106045, 30.98302208536956],
-    [10, 70.849229992994, 60.85725344791104, 90.86534254299771],
-    [11, 43.503779036858504, 82.60634250095342, 68.19490078201605],
-    [12, 60.0376882016192, 71.96274375204584, 80.40357398233618],
-    [13, 57.560776504012715, 70.24438201022812, 84.24630667603672],
-    [14, 6.917407607670145, 72.70932394664027, 92.70149652145491],
-    [15, 52.99747531574345, 16.291487175787466, 53.24018599966188],
-    [16, 1.0071188950106946, 41.94980629936511, 91.87773458349675],
-    [17, 66.15751480391704, 22.21391137152623, 85.38146257419307],
-    [18, 59.629301140092394, 28.28432970379515, 16.131800083057403],
-    [19, 4.324916705689363, 75.47876252723812, 67.07166412686874],
-    [20, 73.20182867342032, 62.82390823905839, 61.75467308144935],
-    [21, 31.61301648653754, 45.986030342711004, 11.982196190215488],
-    [22, 13.269375225505941, 93.50418629136776, 84.51015684128323],
-    [23, 21.32469616324377, 28.136619538457776, 57.26511315197525],
-    [24, 98.09553763605257, 24.370686005567666, 59.240905598518154],
-    [25, 68.39552956185044, 63.65788841546311, 70.13508065364431],
-    [26, 80.05426939121058, 29.8353366107149, 78.62195691268813],
-    [27, 87.00904410282078, 52.573425293919094, 30.16595910582579],
-    [28, 19.383341333047543, 15.653723936949627, 48.781838686889735],
-    [29, 73.69865485134557, 46.657512928263756, 69.74210891733233],
-    [30, 18.72844999166947, 49.279518701283095, 35.665338100310464],
-    [31, 27.678949056721446, 39.30483635432317, 77.41825410981643],
-    [32, 13.438682206595853, 95.06421043767763, 23.640797079810184],
-    [33, 55.79834011603681, 74.1688211886557, 34.07307602896104],
-    [34, 98.92514919943318, 4.05141695462704, 93.29278430640873],
-    [35, 40.106185885086745, 61.11316289818952, 93.51473149749721],
-    [36, 40.89346823933738, 73.72147339660434, 35.64368287788501],
-    [37, 16.864041917769658, 25.5372371238062, 67.59446125221598],
-    [38, 50.23706748928991, 53.4071203788533, 34.796412822038526],
-    [39, 39.54951312733914, 78.80171195100652, 45.183640336595765],
-    [40, 72.33381816996841, 98.04037029265565, 77.89277045628013],
-    [41, 11.853117032988036, 87.12849761649963, 34.14414479518041],
-    [42, 62.33055380706137, 50.790371887314755, 49.84665037307251],
-    [43, 34.938406888824034, 82.50477687731323, 71.83530970511154],
-    [44, 12.612295942555185, 56.72966249479457, 13.459929016526866],
-    [45, 65.8897927790948, 70.24162580305249, 71.55935281310033],
-    [46, 54.92612252199714, 96.29241890834447, 37.12129058610771],
-    [47, 22.481823414590707, 60.04650877145311, 44.712901860236585],
-    [48, 59.542328419979775, 15.282037537100578, 54.09598807899538],
-    [49, 77.78055265976847, 34.655466470270305, 12.311869868490401],
-    [50, 22.344423364852094, 97.09822000954779, 58.00088923280376]
-]
+def load_points(source, tick=None):
+    # Scenario CSV, or a trajectory log at `tick` (its last tick by default)
+    if source.endswith('.traj'):
+        from replay import TrajectoryReader
+        reader = TrajectoryReader(source)
+        state = reader.state_at(int(reader.ticks[-1]) if tick is None else tick)
+        return state.plane_ids, state.plane_state[:, :3], state.target_ids, state.target_pos
+    blue_planes, targets = load_csv(source)
+    return (np.array([p.id for p in blue_planes]), np.array([p.position for p in blue_planes]).reshape(-1, 3),
+            np.array([t.id for t in targets]), np.array([t.position for t in targets]).reshape(-1, 3))
 
+def decimate(points, max_points, bins=None, seed=0):
+    # Returns (points, marker sizes). Past max_points, either keep a random subset or, with
+    # bins, draw one marker per occupied x-y cell at its centroid, sized by its population.
+    if len(points) <= max_points:
+        return points, np.full(len(points), 20.0)
+    if not bins:
+        keep = np.random.default_rng(seed).choice(len(points), max_points, replace=False)
+        return points[keep], np.full(max_points, 20.0)
+    lo, hi = points[:, :2].min(axis=0), points[:, :2].max(axis=0)
+    cells = np.clip(((points[:, :2] - lo) / np.maximum(hi - lo, 1e-9) * bins).astype(int), 0, bins - 1)
+    _, inverse, counts = np.unique(cells[:, 0] * bins + cells[:, 1], return_inverse=True, return_counts=True)
+    centroids = np.column_stack([np.bincount(inverse, weights=points[:, k]) for k in range(3)]) / counts[:, None]
+    return centroids, 5 + 45 * counts / counts.max()
 
+def draw_positions(ax, plane_xyz, target_xyz, plane_ids=None, max_points=5000, bins=None, label_limit=50):
+    # One scatter call per class; plane labels only while there are few enough to read
+    for points, color in ((plane_xyz, 'blue'), (target_xyz, 'red')):
+        if len(points):
+            shown, sizes = decimate(np.asarray(points), max_points, bins)
+            ax.scatter(shown[:, 0], shown[:, 1], shown[:, 2], c=color, marker='o', s=sizes, depthshade=False)
+    if plane_ids is not None and 0 < len(plane_ids) <= label_limit:
+        for plane_id, (x, y, z) in zip(plane_ids, plane_xyz):
+            ax.text(x, y, z, f'{plane_id}', size=12, zorder=1, color='k')
 
-# Unpack the data
-ids, x_positions, y_positions, z_positions = zip(*blue_planes)
+    ax.set_xlabel('X ')
+    ax.set_ylabel('Y ')
+    ax.set_zlabel('Z ')
+    return ax
 
-# Create a 3D scatter plot
-fig = plt.figure(figsize=(10, 7))
-ax = fig.add_subplot(111, projection='3d')
+def main():
+    parser = argparse.ArgumentParser(description='3D positions of blue planes and targets')
+    parser.add_argument('source', nargs='?', default='input_data_3d_beastmode.csv',
+                        help='scenario CSV or trajectory log (.traj)')
+    parser.add_argument('--tick', type=int, help='tick to draw from a trajectory log')
+    parser.add_argument('--out', help='render offscreen (Agg) to this file instead of opening a window')
+    parser.add_argument('--max-points', type=int, default=5000, help='points per class before decimating')
+    parser.add_argument('--bins', type=int, help='density-bin large classes on an x-y grid of this size')
+    args = parser.parse_args()
 
-# Plot the positions
-# Plot blue planes
-for plane in blue_planes:
-    ax.scatter(plane[1], plane[2], plane[3], c='blue', marker='o')
+    if args.out:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
+    plane_ids, plane_xyz, target_ids, target_xyz = load_points(args.source, args.tick)
+    fig = plt.figure(figsize=(10, 7))
+    ax = fig.add_subplot(111, projection='3d')
+    draw_positions(ax, plane_xyz, target_xyz, plane_ids, args.max_points, args.bins)
+    ax.set_title('3D Positions of Planes' if args.tick is None else f'3D Positions of Planes at Tick {args.tick}')
 
-for plane in red_planes:
-    ax.scatter(plane[1], plane[2], plane[3], c='red', marker='o')
+    if args.out:
+        fig.savefig(args.out, dpi=100)
+    else:
+        plt.show()
 
-# Label the axes
-ax.set_xlabel('X ')
-ax.set_ylabel('Y ')
-ax.set_zlabel('Z ')
-ax.set_title('3D Positions of Planes')
-
-# Annotate points with plane IDs
-for i, plane_id in enumerate(ids):
-    ax.text(x_positions[i], y_positions[i], z_positions[i], f'{plane_id}', size=12, zorder=1, color='k')
-
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
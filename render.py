@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import matplotlib
+matplotlib.use('Agg')  # Workers never open a window
+import numpy as np
+
+from plot_locations import draw_positions
+from replay import TrajectoryReader
+
+def scene_limits(reader, samples=20):
+    # Fixed axes for the whole animation, taken from a handful of keyframe states, so frames
+    # do not rescale and jitter as entities move
+    positions = reader.keyframes[np.linspace(0, len(reader.keyframes) - 1, min(samples, len(reader.keyframes))).astype(int)]
+    lo, hi = np.full(3, np.inf), np.full(3, -np.inf)
+    for position in positions:
+        state = reader.state_at(int(reader.ticks[position]))
+        for points in (state.plane_state[:, :3], state.target_pos):
+            if len(points):
+                lo, hi = np.minimum(lo, points.min(axis=0)), np.maximum(hi, points.max(axis=0))
+    pad = np.maximum(hi - lo, 1.0) * 0.1
+    return lo - pad, hi + pad
+
+def draw_frame(ax, state, limits, max_points=5000, bins=None):
+    ax.cla()
+    draw_positions(ax, state.plane_state[:, :3], state.target_pos, state.plane_ids, max_points, bins)
+    if state.shots:
+        # A line from each shooter to where its target was last seen, the tick before the kill
+        planes = dict(zip(state.plane_ids.tolist(), state.plane_state[:, :3]))
+        for (plane, target, weapon_range, pg), target_pos in zip(state.shots, state.shot_pos):
+            if plane in planes and not np.isnan(target_pos).any():
+                ax.plot(*np.column_stack([planes[plane], target_pos]), c='orange', lw=1)
+    ax.set_xlim(limits[0][0], limits[1][0])
+    ax.set_ylim(limits[0][1], limits[1][1])
+    ax.set_zlim(limits[0][2], limits[1][2])
+    ax.set_title(f'Tick {state.tick}: {len(state.plane_ids)} planes, {len(state.target_ids)} targets')
+
+def _render_chunk(job):
+    # One contiguous tick range per job: the worker maps the log itself and replays the range
+    # sequentially from its keyframe, reusing a single figure for every frame it writes
+    path, out_dir, start_tick, stop_tick, every, limits, max_points, bins, dpi = job
+    import matplotlib.pyplot as plt
+    reader = TrajectoryReader(path)
+    fig = plt.figure(figsize=(10, 7))
+    ax = fig.add_subplot(111, projection='3d')
+    written = []
+    for state in reader.stream(start_tick, stop_tick):
+        if state.tick % every:
+            continue
+        draw_frame(ax, state, limits, max_points, bins)
+        frame = os.path.join(out_dir, f'frame_{state.tick:06d}.png')
+        fig.savefig(frame, dpi=dpi)
+        written.append(frame)
+    plt.close(fig)
+    return written
+
+def render_animation(path, out_dir='frames', processes=None, every=1, chunks_per_process=4,
+                     max_points=5000, bins=None, dpi=80):
+    # Splits the log's ticks into contiguous chunks over a process pool and writes one PNG per
+    # rendered tick, named by tick so the sequence sorts in playback order
+    reader = TrajectoryReader(path)
+    os.makedirs(out_dir, exist_ok=True)
+    limits = scene_limits(reader)
+    processes = processes or os.cpu_count()
+    bounds = np.linspace(0, len(reader), processes * chunks_per_process + 1).astype(int)
+    jobs = [(path, out_dir, int(reader.ticks[a]), int(reader.ticks[b - 1]), every, limits, max_points, bins, dpi)
+            for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    frames = []
+    with Pool(processes) as pool:
+        for written in pool.imap_unordered(_render_chunk, jobs):
+            frames += written
+    return sorted(frames)
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'run.traj'
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else 'frames'
+    every = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    start = time.perf_counter()
+    frames = render_animation(path, out_dir, every=every)
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {len(frames)} frames to {out_dir}/ in {elapsed:.2f} s ({elapsed / max(len(frames), 1) * 1000:.0f} ms per frame)")
+    print(f"Stitch with: ffmpeg -framerate 30 -pattern_type glob -i '{out_dir}/frame_*.png' -pix_fmt yuv420p run.mp4")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import sys
+
+import numpy as np
+
+from trajectory import (RECORD, RECORD_INT, MAGIC, VERSION, TICK, PLANE_KEY, PLANE_DELTA, TARGET_KEY,
+                        TARGET_DELTA, PLANE_GONE, TARGET_GONE, REPORT, PAIR, SHOT)
+
+class EntityTable:
+    # Sorted ids with one state row each, updated the same way DeltaEncoder tracks them
+    def __init__(self, width):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.values = np.empty((0, width))
+
+    def apply(self, block, key_kind, delta_kind, gone_kind, reset):
+        width = self.values.shape[1]
+        fields = list('abcd'[:width])
+        keys = block[block['kind'] == key_kind]
+        if reset:
+            self.ids = np.empty(0, dtype=np.int64)
+            self.values = np.empty((0, width))
+
+        gone = block['id'][block['kind'] == gone_kind]
+        if len(gone):
+            keep = ~np.isin(self.ids, gone)
+            self.ids, self.values = self.ids[keep], self.values[keep]
+
+        deltas = block[block['kind'] == delta_kind]
+        if len(deltas):
+            slot = np.searchsorted(self.ids, deltas['id'])
+            self.values[slot] += np.column_stack([deltas[f] for f in fields]).astype(np.float32)
+
+        if len(keys):
+            ids = np.concatenate([self.ids, keys['id'].astype(np.int64)])
+            values = np.concatenate([self.values, np.column_stack([keys[f] for f in fields]).astype(float)])
+            order = np.argsort(ids, kind='stable')
+            self.ids, self.values = ids[order], values[order]
+
+    def lookup(self, ids):
+        # Rows for ids, NaN for any not in the table
+        slot = np.searchsorted(self.ids, ids).clip(0, max(len(self.ids) - 1, 0))
+        found = self.ids[slot] == ids if len(self.ids) else np.zeros(len(ids), dtype=bool)
+        values = np.full((len(ids), self.values.shape[1]), np.nan)
+        values[found] = self.values[slot[found]]
+        return values
+
+class TickState:
+    def __init__(self, tick, planes, targets, block, shot_pos):
+        ints = block.view(RECORD_INT)
+        self.tick = tick
+        self.plane_ids = planes.ids.copy()
+        self.plane_state = planes.values.copy()  # rows of x, y, z, fuel
+        self.target_ids = targets.ids.copy()
+        self.target_pos = targets.values.copy()
+        reports = ints[ints['kind'] == REPORT]
+        self.reports = np.column_stack([reports['a'], reports['id']])  # (plane, target)
+        pairs = ints[ints['kind'] == PAIR]
+        self.pairs = np.column_stack([pairs['id'], pairs['a'], pairs['b']])  # (target, plane, plane)
+        shots = block[block['kind'] == SHOT]
+        self.shots = [(int(p), int(t), float(r), float(pg))  # (plane, target, weapon range, PG)
+                      for p, t, r, pg in zip(shots.view(RECORD_INT)['a'], shots['id'], shots['c'], shots['d'])]
+        # Killed targets are gone from this tick's state, so each shot also carries its target's
+        # position the tick before (NaN if the replay started too late to know it)
+        self.shot_pos = shot_pos
+
+class TrajectoryReader:
+    # Memory-maps a trajectory log and indexes its tick markers once; state at any tick is
+    # rebuilt from the nearest keyframe at or before it, touching only the blocks in between
+    def __init__(self, path):
+        self.records = np.memmap(path, dtype=RECORD, mode='r')
+        header = self.records[:1].view(RECORD_INT)[0]
+        if header['a'] != MAGIC or header['id'] != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} trajectory log")
+        self.keyframe_interval = int(header['b'])
+        self.offsets = self._index(path)
+        markers = self.records[self.offsets].view(RECORD_INT)
+        self.ticks = markers['id'].astype(np.int64)
+        self.counts = markers['a'].astype(np.int64)
+        self.keyframes = np.flatnonzero(markers['flag'] == 1)  # positions within self.ticks
+        self.keyframe_positions = set(self.keyframes.tolist())
+
+    def _index(self, path):
+        # Hops from each tick marker to the next by its record count, so opening a log reads
+        # one record per tick; a tick cut short at the end of the file is left out
+        markers = self.records.view(RECORD_INT)
+        offsets = []
+        offset = 1
+        while offset < len(markers):
+            marker = markers[offset]
+            if marker['kind'] != TICK:
+                raise ValueError(f"{path}: expected a tick marker at record {offset}")
+            end = offset + 1 + int(marker['a'])
+            if end > len(markers):
+                break
+            offsets.append(offset)
+            offset = end
+        return np.array(offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def block(self, position):
+        start = self.offsets[position] + 1
+        return np.asarray(self.records[start:start + self.counts[position]])
+
+    def position_of(self, tick):
+        position = int(np.searchsorted(self.ticks, tick))
+        if position == len(self.ticks) or self.ticks[position] != tick:
+            raise KeyError(f"Tick {tick} is not in the log")
+        return position
+
+    def _apply(self, planes, targets, position):
+        block = self.block(position)
+        shot_pos = targets.lookup(block['id'][block['kind'] == SHOT])
+        reset = position in self.keyframe_positions
+        planes.apply(block, PLANE_KEY, PLANE_DELTA, PLANE_GONE, reset)
+        targets.apply(block, TARGET_KEY, TARGET_DELTA, TARGET_GONE, reset)
+        return block, shot_pos
+
+    def _replay_from(self, position):
+        # Keyframe to replay from so the tick before `position` is applied too, which is where
+        # that tick's shot targets were last seen
+        before = max(position - 1, 0)
+        return self.keyframes[np.searchsorted(self.keyframes, before, side='right') - 1]
+
+    def state_at(self, tick):
+        position = self.position_of(tick)
+        planes, targets = EntityTable(4), EntityTable(3)
+        for p in range(self._replay_from(position), position + 1):
+            block, shot_pos = self._apply(planes, targets, p)
+        return TickState(tick, planes, targets, block, shot_pos)
+
+    def stream(self, start_tick=None, stop_tick=None):
+        # Sequential replay: each block is applied once, seeking to start_tick via its keyframe
+        position = 0 if start_tick is None else self.position_of(start_tick)
+        planes, targets = EntityTable(4), EntityTable(3)
+        for p in range(self._replay_from(position), len(self.ticks)):
+            if stop_tick is not None and self.ticks[p] > stop_tick:
+                break
+            block, shot_pos = self._apply(planes, targets, p)
+            if p >= position:
+                yield TickState(int(self.ticks[p]), planes, targets, block, shot_pos)
+
+    def __iter__(self):
+        return self.stream()
+
+    def plot(self, tick, ax=None, plotter=None):
+        # Plotting hook: plotter(state, ax) draws a tick; the default is a 3D scatter
+        state = self.state_at(tick)
+        if plotter:
+            return plotter(state, ax)
+        import matplotlib.pyplot as plt
+        if ax is None:
+            ax = plt.figure(figsize=(10, 7)).add_subplot(111, projection='3d')
+        ax.scatter(*state.plane_state[:, :3].T, c='blue', marker='o')
+        ax.scatter(*state.target_pos.T, c='red', marker='o')
+        ax.set_title(f'Tick {tick}')
+        return ax
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'run.traj'
+    reader = TrajectoryReader(path)
+    print(f"{path}: {len(reader)} ticks, keyframe every {reader.keyframe_interval}")
+    tick = int(sys.argv[2]) if len(sys.argv) > 2 else int(reader.ticks[-1])
+    state = reader.state_at(tick)
+    print(f"Tick {tick}: {len(state.plane_ids)} planes, {len(state.target_ids)} targets, {len(state.shots)} shots")
+    for plane, target, weapon_range, pg in state.shots:
+        print(f"Target {target} shot down by Plane {plane} with weapon range {weapon_range} km and PG {pg:.4f}")
+
+if __name__ == "__main__":
+    main()
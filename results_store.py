@@ -0,0 +1,129 @@
+import json
+import sqlite3
+import sys
+import time
+
+from headless import ENGINE_VERSION
+from sweep import run_sweep
+
+RUN_METRICS = ('ticks', 'kills', 'targets_left', 'planes_left', 'fuel_left', 'weapons_left',
+               'pg_total', 'pg_mean', 'pg_min', 'pg_max', 'elapsed')
+TICK_METRICS = ('tick', 'kills', 'pg', 'fuel', 'weapons_left', 'move_ms', 'engage_ms')
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    cache_key TEXT UNIQUE,
+    scenario TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    engine_version INTEGER NOT NULL,
+    {', '.join(f'{name} REAL' for name in RUN_METRICS)}
+);
+CREATE INDEX IF NOT EXISTS runs_scenario ON runs (scenario, parameters, seed);
+CREATE INDEX IF NOT EXISTS runs_parameters ON runs (parameters, seed);
+CREATE INDEX IF NOT EXISTS runs_seed ON runs (seed);
+CREATE TABLE IF NOT EXISTS run_parameters (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (name, value, run_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ticks (
+    run_id INTEGER NOT NULL,
+    {', '.join(f'{name} REAL' for name in TICK_METRICS)},
+    PRIMARY KEY (run_id, tick)
+) WITHOUT ROWID;
+"""
+
+class ResultsStore:
+    # SQLite store for sweep and replication output. Runs are keyed by their sweep cache key,
+    # so re-inserting a cached cell is a no-op; writes are buffered and flushed in one
+    # transaction per batch, which keeps a single writer ahead of a parallel sweep.
+    def __init__(self, path='results.sqlite', batch_size=500):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def add(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, records):
+        for record in records:
+            self.add(record)
+        self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        with self.connection:
+            for record in self.buffer:
+                result = record['result']
+                cursor = self.connection.execute(
+                    f"INSERT OR IGNORE INTO runs (cache_key, scenario, parameters, seed, engine_version, "
+                    f"{', '.join(RUN_METRICS)}) VALUES ({', '.join('?' * (5 + len(RUN_METRICS)))})",
+                    (record['key'], record['scenario'], json.dumps(record['parameters'], sort_keys=True),
+                     record['seed'], ENGINE_VERSION) + tuple(result[name] for name in RUN_METRICS))
+                if not cursor.rowcount:
+                    continue  # Already stored by an earlier sweep
+                run_id = cursor.lastrowid
+                self.connection.executemany(
+                    'INSERT INTO run_parameters VALUES (?, ?, ?)',
+                    [(run_id, name, value) for name, value in record['parameters'].items()])
+                self.connection.executemany(
+                    f"INSERT INTO ticks VALUES (?, {', '.join('?' * len(TICK_METRICS))})",
+                    [(run_id, *row) for row in result.get('tick_metrics', [])])
+        self.buffer = []
+
+    def query_runs(self, scenario=None, seed=None, **parameters):
+        # Matches on any subset of scenario, seed and individual parameter values
+        clauses = []
+        args = []
+        if scenario is not None:
+            clauses.append('scenario = ?')
+            args.append(scenario)
+        if seed is not None:
+            clauses.append('seed = ?')
+            args.append(seed)
+        for name, value in parameters.items():
+            clauses.append('run_id IN (SELECT run_id FROM run_parameters WHERE name = ? AND value = ?)')
+            args += [name, value]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor = self.connection.execute(f"SELECT * FROM runs {where}", args)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def summary(self, scenario=None):
+        # Mean kills, ticks and PG per parameter set across seeds
+        where = 'WHERE scenario = ?' if scenario else ''
+        return self.connection.execute(
+            f"SELECT scenario, parameters, COUNT(*), AVG(kills), AVG(ticks), AVG(pg_total) FROM runs {where} "
+            f"GROUP BY scenario, parameters ORDER BY scenario, parameters", (scenario,) if scenario else ()).fetchall()
+
+    def tick_series(self, run_id):
+        return self.connection.execute(
+            f"SELECT {', '.join(TICK_METRICS)} FROM ticks WHERE run_id = ? ORDER BY tick", (run_id,)).fetchall()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+def main():
+    scenarios = sys.argv[1:] or ['input_data_3d.csv']
+    store = ResultsStore()
+    start = time.perf_counter()
+    records = run_sweep(scenarios, {'fuel_burn_rate': [1, 2, 4], 'range_scale': [0.05, 0.1]},
+                        seeds=range(10), record_ticks=True, on_result=store.add)
+    store.add_many(r for r in records if r['cached'])  # Cells already cached may predate this store
+    print(f"Stored {len(records)} runs in {time.perf_counter() - start:.2f} s\n")
+    for scenario, parameters, runs, kills, ticks, pg in store.summary():
+        print(f"{scenario} {parameters}: {runs} runs, mean kills {kills:.2f}, ticks {ticks:.1f}, PG {pg:.4f}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
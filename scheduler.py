@@ -0,0 +1,69 @@
+import heapq
+import itertools
+import sys
+
+from wtpmv6 import load_csv, compute_pg, move_entities
+
+def all_candidates(blue_planes, target):
+    return [(plane, weapon) for plane in blue_planes for weapon in plane.weapons]
+
+def build_shot_heap(blue_planes, targets, candidates=all_candidates):
+    # Max-heap via negated PG; the counter keeps ties in target/plane order and avoids comparing objects
+    counter = itertools.count()
+    heap = []
+    for target in targets:
+        for plane, weapon in candidates(blue_planes, target):
+            pg = compute_pg(plane, weapon, target)
+            if pg > 0:
+                heap.append((-pg, next(counter), plane, weapon, target))
+    heapq.heapify(heap)
+    return heap
+
+def schedule_engagements(blue_planes, targets, candidates=all_candidates):
+    # Pops the best remaining shot until none is left; entries whose weapon was
+    # already fired or whose target is already killed are dropped when they surface
+    heap = build_shot_heap(blue_planes, targets, candidates)
+    fired = set()
+    killed = set()
+    shots = []
+    stale = 0
+    while heap:
+        neg_pg, _, plane, weapon, target = heapq.heappop(heap)
+        if weapon in fired or target in killed:
+            stale += 1
+            continue
+        fired.add(weapon)
+        killed.add(target)
+        shots.append((plane, weapon, target, -neg_pg))
+    return shots, stale
+
+def engage(blue_planes, targets, candidates=all_candidates):
+    shots, stale = schedule_engagements(blue_planes, targets, candidates)
+    for plane, weapon, target, pg in shots:
+        if plane.fire_weapon(weapon):
+            targets.remove(target)
+            print(f"Target {target.id} shot down by Plane {plane.id} with weapon range {weapon.range} km and PG {pg:.4f}")
+    return shots, stale
+
+def main():
+    blue_planes, targets = load_csv('input_data_3d_beastmode.csv')
+    # At full range everything is shot down on the first tick
+    range_scale = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    for plane in blue_planes:
+        for weapon in plane.weapons:
+            weapon.range *= range_scale
+    tick = 0
+    total_pg = 0
+
+    while targets and blue_planes:
+        move_entities(blue_planes, targets)
+        tick += 1
+        shots, stale = engage(blue_planes, targets)
+        total_pg += sum(shot[3] for shot in shots)
+        print(f"\nTick {tick}: {len(shots)} shots fired, {stale} stale heap entries discarded")
+        blue_planes = [plane for plane in blue_planes if plane.fuel > 0]
+
+    print(f"\nFinished after {tick} ticks with total PG {total_pg:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from events import EventStream
+from headless import run_tick
+from wtpmv6 import load_csv, Target
+
+class Simulation:
+    # One loaded scenario advanced tick by tick. step() runs on an executor thread; the
+    # service holds `lock` around it so steps, injections and reads never interleave.
+    def __init__(self, scenario, seed=0, range_scale=1.0, snapshot_interval=0):
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        self.blue_planes, self.targets = load_csv(scenario)
+        for plane in self.blue_planes:
+            for weapon in plane.weapons:
+                weapon.range *= range_scale
+        self.tick = 0
+        self.next_target_id = max((target.id for target in self.targets), default=0) + 1
+        self.pending = []  # Event lines since the last drain
+        self.stream = EventStream(self.pending.append, snapshot_interval)
+        self.lock = asyncio.Lock()
+
+    def step(self, ticks):
+        for _ in range(ticks):
+            if not (self.targets and self.blue_planes):
+                break
+            self.tick += 1
+            self.blue_planes, _, _ = run_tick(self.blue_planes, self.targets, self.tick, self.rng, stream=self.stream)
+        return self.status()
+
+    def inject(self, rows):
+        # rows of [x, y, z] or [id, x, y, z]; ids are assigned past any the run has used, so
+        # an injected target never reuses the id of one already killed. All rows are checked
+        # before any is added, since a malformed target would break every later step.
+        for row in rows:
+            if not (isinstance(row, list) and len(row) in (3, 4)
+                    and all(isinstance(c, (int, float)) and not isinstance(c, bool) and math.isfinite(c) for c in row)):
+                raise ValueError(f"Target rows are [x, y, z] or [id, x, y, z], got {row!r}")
+            if len(row) == 4 and row[0] != int(row[0]):
+                raise ValueError(f"Target id must be an integer, got {row[0]!r}")
+        added = []
+        for row in rows:
+            if len(row) == 4:
+                target_id, position = int(row[0]), row[1:]
+            else:
+                target_id, position = self.next_target_id, row
+            self.next_target_id = max(self.next_target_id, target_id + 1)
+            self.targets.append(Target(target_id, tuple(float(c) for c in position)))
+            added.append(target_id)
+        return added
+
+    def drain(self):
+        lines, self.pending[:] = self.pending[:], []
+        return lines
+
+    def status(self):
+        return {'tick': self.tick, 'planes': len(self.blue_planes), 'targets': len(self.targets),
+                'done': not (self.targets and self.blue_planes)}
+
+class SimulationService:
+    # Line-delimited JSON over TCP. Requests carry an id that the reply echoes, so a client
+    # may pipeline any number of them; each connection's replies come back in request order.
+    #   {"id": 1, "op": "load", "sim": "a", "scenario": "...", "seed": 0, "range_scale": 0.1}
+    #   {"id": 2, "op": "step", "sim": "a", "ticks": 10}
+    #   {"id": 3, "op": "inject", "sim": "a", "targets": [[x, y, z], [id, x, y, z]]}
+    #   {"id": 4, "op": "subscribe", "sim": "a"}   then {"sim": "a", "event": {...}} lines
+    #   {"id": 5, "op": "status", "sim": "a"}
+    # Steps run on a thread pool, so the event loop keeps reading, replying and streaming
+    # to other clients while one simulation computes.
+    def __init__(self, max_workers=4):
+        self.simulations = {}
+        self.subscribers = {}  # sim name -> set of StreamWriters
+        self.executor = ThreadPoolExecutor(max_workers)
+
+    async def start(self, host='127.0.0.1', port=0):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                request = None
+                try:
+                    request = json.loads(line)
+                    reply = await self.dispatch(request, writer)
+                    reply['ok'] = True
+                except Exception as e:
+                    # Any failure is the request's, never the connection's
+                    reply = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                reply['id'] = request.get('id') if isinstance(request, dict) else None
+                writer.write((json.dumps(reply) + '\n').encode())
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+    async def dispatch(self, request, writer):
+        op = request['op']
+        name = request.get('sim', 'default')
+        loop = asyncio.get_running_loop()
+        if op == 'load':
+            self.simulations[name] = await loop.run_in_executor(
+                self.executor, lambda: Simulation(request['scenario'], request.get('seed', 0),
+                                                  request.get('range_scale', 1.0),
+                                                  request.get('snapshot_interval', 0)))
+            return self.simulations[name].status()
+        if op == 'subscribe':
+            self.subscribers.setdefault(name, set()).add(writer)
+            return {}
+
+        simulation = self.simulations[name]
+        async with simulation.lock:
+            if op == 'step':
+                status = await loop.run_in_executor(self.executor, simulation.step, int(request.get('ticks', 1)))
+            elif op == 'inject':
+                status = {'added': simulation.inject(request['targets'])}
+            elif op == 'status':
+                status = simulation.status()
+            else:
+                raise ValueError(f"Unknown op {op}")
+            await self.publish(name, simulation.drain())
+        return status
+
+    async def publish(self, name, lines):
+        writers = self.subscribers.get(name)
+        if not (lines and writers):
+            return
+        payload = ''.join(f'{{"sim":{json.dumps(name)},"event":{line}}}\n' for line in lines).encode()
+        for writer in list(writers):
+            writer.write(payload)
+        await asyncio.gather(*(writer.drain() for writer in writers), return_exceptions=True)
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+class ServiceClient:
+    # Pipelining client: request() sends immediately and resolves when its reply arrives;
+    # streamed events land on self.events
+    def __init__(self):
+        self.futures = {}
+        self.events = asyncio.Queue()
+        self.next_id = 0
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        try:
+            while line := await self.reader.readline():
+                message = json.loads(line)
+                if 'event' in message:
+                    self.events.put_nowait(message)
+                elif (future := self.futures.pop(message.get('id'), None)) is not None:
+                    future.set_result(message)
+        finally:
+            # Requests still waiting when the connection goes will never get a reply
+            for future in self.futures.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the service closed"))
+            self.futures.clear()
+
+    def request(self, op, **fields):
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        if self.listener.done():
+            future.set_exception(ConnectionError("Connection to the service closed"))
+            return future
+        self.futures[self.next_id] = future
+        self.writer.write((json.dumps(dict(fields, id=self.next_id, op=op)) + '\n').encode())
+        return future
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+async def demo(scenario, clients=4):
+    service = SimulationService()
+    port = await service.start()
+    start = time.perf_counter()
+
+    async def drive(n):
+        client = ServiceClient()
+        await client.connect('127.0.0.1', port)
+        sim = f"sim{n}"
+        await client.request('load', sim=sim, scenario=scenario, seed=n, range_scale=0.1)
+        await client.request('subscribe', sim=sim)
+        # Pipelined: all of these are on the wire before the first reply comes back
+        replies = [client.request('step', sim=sim, ticks=5) for _ in range(4)]
+        replies.append(client.request('inject', sim=sim, targets=[[50, 50, 50], [60, 40, 30]]))
+        replies += [client.request('step', sim=sim, ticks=10) for _ in range(4)]
+        replies = await asyncio.gather(*replies)
+        await client.close()
+        return sim, replies[-1], replies[4]['added'], client.events.qsize()
+
+    for sim, status, added, events in await asyncio.gather(*(drive(n) for n in range(clients))):
+        print(f"{sim}: tick {status['tick']}, {status['targets']} targets and {status['planes']} planes left, "
+              f"injected targets {added}, {events} events streamed")
+    print(f"{clients} clients served in {time.perf_counter() - start:.2f} s")
+    await service.close()
+
+async def serve(port):
+    service = SimulationService()
+    port = await service.start(port=port)
+    print(f"Simulation service listening on 127.0.0.1:{port}")
+    await service.server.serve_forever()
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        asyncio.run(serve(int(sys.argv[2]) if len(sys.argv) > 2 else 8765))
+        return
+    asyncio.run(demo(sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d_beastmode.csv'))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import bisect
+import random
+import sys
+import time
+from multiprocessing import Pipe, Process
+
+from headless import move
+from wtpmv6 import load_csv, distance_3d, compute_pg, BluePlane, Target
+from coverage import max_weapon_range
+from pairing import best_pair
+from fleet import synthetic_fleet
+
+class Shard:
+    # Owns the planes and targets whose x falls in [bounds[index], bounds[index + 1]).
+    # Entities within `halo` of another slab are mirrored there each tick as read-only ghosts.
+    def __init__(self, index, bounds, halo, seed=None):
+        self.index = index
+        self.bounds = bounds
+        self.halo = halo
+        self.rng = random.Random(seed)
+        self.planes = {}  # id -> BluePlane
+        self.targets = {}  # id -> Target
+        self.pairs = {}  # target id -> (plane id, plane id)
+        self.pending = {}  # target id -> (plane, weapon) proposed this tick
+
+    def owner(self, x):
+        return min(max(bisect.bisect_right(self.bounds, x) - 1, 0), len(self.bounds) - 2)
+
+    def move(self):
+        move(self.planes.values(), self.targets.values(), self.rng)
+
+        emigrants = []
+        for kind, entities in (('plane', self.planes), ('target', self.targets)):
+            for entity_id in [i for i, e in entities.items() if self.owner(e.position[0]) != self.index]:
+                entity = entities.pop(entity_id)
+                emigrants.append((self.owner(entity.position[0]), kind, entity))
+        return emigrants
+
+    def admit(self, entities):
+        for kind, entity in entities:
+            (self.planes if kind == 'plane' else self.targets)[entity.id] = entity
+
+    def halo_out(self):
+        # shard index -> (plane ghosts, target ghosts) for every other slab within halo distance
+        out = {}
+        for kind, entities in (('plane', self.planes), ('target', self.targets)):
+            for entity in entities.values():
+                x = entity.position[0]
+                for shard in range(self.owner(x - self.halo), self.owner(x + self.halo) + 1):
+                    if shard != self.index:
+                        ghosts = out.setdefault(shard, ([], []))
+                        ghosts[0 if kind == 'plane' else 1].append((entity.id, entity.position))
+        return out
+
+    def engage(self, ghost_planes, ghost_targets, sensor_range):
+        sensors = list(self.planes.values()) + [BluePlane(i, p, 0) for i, p in ghost_planes]
+        for target in self.targets.values():
+            seeing = [s for s in sensors if distance_3d(s.position, target.position) <= sensor_range]
+            if len(seeing) > 2:
+                pair, _ = best_pair(seeing, target)
+                self.pairs[target.id] = (pair[0].id, pair[1].id)
+
+        # Local select_best_weapon over owned and ghost targets; a proposal only becomes a
+        # shot once the target's owner accepts it, so weapons are not consumed here
+        self.pending = {}
+        proposed = set()
+        claims = []
+        targets = list(self.targets.values()) + [Target(i, p) for i, p in ghost_targets]
+        for target in sorted(targets, key=lambda t: t.id):
+            best = None
+            best_pg = 0
+            for plane in self.planes.values():
+                for weapon in plane.weapons:
+                    if id(weapon) in proposed:
+                        continue
+                    pg = compute_pg(plane, weapon, target)
+                    if pg > best_pg:
+                        best, best_pg = (plane, weapon), pg
+            if best:
+                proposed.add(id(best[1]))
+                self.pending[target.id] = best
+                claims.append((target.id, self.owner(target.position[0]), best_pg, self.index, best[0].id))
+        return claims
+
+    def commit(self, accepted, killed):
+        for target_id in accepted:
+            plane, weapon = self.pending[target_id]
+            plane.fire_weapon(weapon)
+        for target_id in killed:
+            self.targets.pop(target_id, None)
+            self.pairs.pop(target_id, None)
+        for plane_id in [i for i, p in self.planes.items() if p.fuel <= 0]:
+            del self.planes[plane_id]  # Remove planes with zero fuel
+        self.pending = {}
+        return len(self.planes), len(self.targets)
+
+def _shard_worker(conn, index, bounds, halo, seed):
+    shard = Shard(index, bounds, halo, seed)
+    while True:
+        command, payload = conn.recv()
+        if command == 'stop':
+            break
+        elif command == 'admit':
+            shard.admit(payload)
+            conn.send(None)
+        elif command == 'move':
+            conn.send(shard.move())
+        elif command == 'halo':
+            conn.send(shard.halo_out())
+        elif command == 'engage':
+            conn.send(shard.engage(*payload))
+        elif command == 'commit':
+            conn.send(shard.commit(*payload))
+    conn.close()
+
+def slab_bounds(blue_planes, targets, shards):
+    # Equal-population slabs along x from the initial layout
+    xs = sorted(entity.position[0] for entity in blue_planes + targets)
+    edges = [xs[len(xs) * i // shards] for i in range(1, shards)]
+    return [-float('inf')] + edges + [float('inf')]
+
+class ShardedBattlespace:
+    def __init__(self, blue_planes, targets, shards=4, halo=None, sensor_range=None, seed=0):
+        self.halo = max_weapon_range(blue_planes) if halo is None else halo
+        self.sensor_range = self.halo if sensor_range is None else min(sensor_range, self.halo)
+        self.bounds = slab_bounds(blue_planes, targets, shards)
+        self.connections = []
+        self.processes = []
+        for index in range(shards):
+            parent, child = Pipe()
+            process = Process(target=_shard_worker, args=(child, index, self.bounds, self.halo, seed + index))
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+        router = Shard(-1, self.bounds, self.halo)
+        initial = [[] for _ in range(shards)]
+        for plane in blue_planes:
+            initial[router.owner(plane.position[0])].append(('plane', plane))
+        for target in targets:
+            initial[router.owner(target.position[0])].append(('target', target))
+        self.broadcast('admit', initial)
+        self.planes_left = len(blue_planes)
+        self.targets_left = len(targets)
+        self.ticks = 0
+        self.kills = 0
+        self.migrations = 0
+
+    def broadcast(self, command, payloads):
+        for conn, payload in zip(self.connections, payloads):
+            conn.send((command, payload))
+        return [conn.recv() for conn in self.connections]
+
+    def step(self):
+        if not (self.planes_left and self.targets_left):
+            return False
+        shards = len(self.connections)
+        self.ticks += 1
+
+        immigrants = [[] for _ in range(shards)]
+        for emigrants in self.broadcast('move', [None] * shards):
+            for destination, kind, entity in emigrants:
+                immigrants[destination].append((kind, entity))
+                self.migrations += 1
+        self.broadcast('admit', immigrants)
+
+        ghosts = [([], []) for _ in range(shards)]
+        for halo in self.broadcast('halo', [None] * shards):
+            for destination, (planes, targets) in halo.items():
+                ghosts[destination][0].extend(planes)
+                ghosts[destination][1].extend(targets)
+
+        # Every target goes to its best claim across shards; ties favour the lower shard
+        best = {}
+        for claims in self.broadcast('engage', [(p, t, self.sensor_range) for p, t in ghosts]):
+            for target_id, owner, pg, shard, plane_id in claims:
+                if target_id not in best or pg > best[target_id][1]:
+                    best[target_id] = (owner, pg, shard, plane_id)
+        accepted = [[] for _ in range(shards)]
+        killed = [[] for _ in range(shards)]
+        for target_id, (owner, pg, shard, plane_id) in best.items():
+            accepted[shard].append(target_id)
+            killed[owner].append(target_id)
+            print(f"Target {target_id} shot down by Plane {plane_id} from shard {shard} with PG {pg:.4f}")
+        self.kills += len(best)
+
+        counts = self.broadcast('commit', list(zip(accepted, killed)))
+        self.planes_left = sum(c[0] for c in counts)
+        self.targets_left = sum(c[1] for c in counts)
+        return True
+
+    def close(self):
+        for conn in self.connections:
+            conn.send(('stop', None))
+        for process in self.processes:
+            process.join()
+
+def main():
+    shards = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    if len(sys.argv) > 2:
+        blue_planes, targets = load_csv(sys.argv[2])
+    else:
+        blue_planes, targets = synthetic_fleet(planes=100, targets=2000).to_objects()
+    space = ShardedBattlespace(blue_planes, targets, shards, sensor_range=150)
+    try:
+        start = time.perf_counter()
+        while space.step():
+            print(f"Tick {space.ticks}: {space.kills} kills, {space.targets_left} targets and "
+                  f"{space.planes_left} planes left, {space.migrations} migrations")
+        print(f"\nFinished in {time.perf_counter() - start:.2f} s")
+    finally:
+        space.close()
+
+if __name__ == "__main__":
+    main()
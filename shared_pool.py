@@ -0,0 +1,160 @@
+import sys
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from fleet import distance_matrix, pg_matrix, best_pairs, synthetic_fleet
+from batch_sim import PLANE_SPREAD, TARGET_SPREAD
+
+class SharedFleet:
+    # FleetArrays columns plus alive masks, each backed by a shared memory block so worker
+    # processes read the live state in place instead of receiving pickled copies
+    FIELDS = ('plane_pos', 'fuel', 'fuel_burn_rate', 'plane_alive', 'weapon_plane', 'weapon_range',
+              'weapon_kinematics', 'weapon_expiring', 'weapon_alive', 'target_pos', 'target_alive')
+
+    def __init__(self, blocks, spec, owner):
+        self.blocks = blocks
+        self.spec = spec  # field -> (block name, shape, dtype), enough for a worker to attach
+        self.owner = owner
+        for field, block in blocks.items():
+            _, shape, dtype = spec[field]
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+    @classmethod
+    def create(cls, fleet):
+        sources = {field: getattr(fleet, field, None) for field in cls.FIELDS}
+        sources['plane_alive'] = np.ones(len(fleet.fuel), dtype=bool)
+        sources['weapon_alive'] = np.ones(len(fleet.weapon_plane), dtype=bool)
+        sources['target_alive'] = np.ones(len(fleet.target_pos), dtype=bool)
+        blocks = {}
+        spec = {}
+        for field, array in sources.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            blocks[field] = block
+            spec[field] = (block.name, array.shape, array.dtype.str)
+        return cls(blocks, spec, owner=True)
+
+    @classmethod
+    def attach(cls, spec):
+        # Pool workers share the creator's resource tracker, so attaching registers nothing new
+        blocks = {field: shared_memory.SharedMemory(name=name) for field, (name, _, _) in spec.items()}
+        return cls(blocks, spec, owner=False)
+
+    def close(self):
+        for field in self.FIELDS:
+            setattr(self, field, None)  # Drop the views before releasing the buffers
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+
+_shared = None
+
+def _attach_worker(spec):
+    global _shared
+    _shared = SharedFleet.attach(spec)
+
+def _evaluate_chunk(args):
+    # select_best_weapon and select_best_pair for targets [start, stop): returns the k best
+    # (weapon, PG) candidates and the sensor pair per target instead of any full matrix
+    start, stop, k, sensor_range = args
+    fleet = _shared
+    target_pos = fleet.target_pos[start:stop]
+    distance = distance_matrix(target_pos, fleet.plane_pos)
+    live = fleet.target_alive[start:stop, None] & fleet.weapon_alive
+    pg = np.where(live, pg_matrix(distance, fleet.fuel, fleet), 0)
+    k = min(k, pg.shape[1])
+    top = np.argpartition(-pg, k - 1, axis=1)[:, :k]
+    top_pg = np.take_along_axis(pg, top, axis=1)
+    order = np.argsort(-top_pg, axis=1)
+    sees = (distance <= sensor_range) & fleet.plane_alive & fleet.target_alive[start:stop, None]
+    pairs = best_pairs(target_pos, fleet.plane_pos, distance, sees)
+    return (start, np.take_along_axis(top, order, axis=1).astype(np.int32),
+            np.take_along_axis(top_pg, order, axis=1), pairs.astype(np.int32))
+
+class ParallelEngine:
+    def __init__(self, fleet, processes=None, chunk_size=256, k=4, sensor_range=np.inf, seed=None):
+        self.shared = SharedFleet.create(fleet)
+        self.pool = Pool(processes, initializer=_attach_worker, initargs=(self.shared.spec,))
+        self.chunk_size = chunk_size
+        self.k = k
+        self.sensor_range = sensor_range
+        self.rng = np.random.default_rng(seed)
+        self.pairs = np.full((len(fleet.target_pos), 2), -1, dtype=np.int32)
+        self.ticks = 0
+        self.kills = 0
+        self.pg_total = 0.0
+
+    def active(self):
+        return self.shared.target_alive.any() and self.shared.plane_alive.any()
+
+    def move(self):
+        s = self.shared
+        moving = s.plane_alive & (s.fuel > 0)
+        s.plane_pos += np.where(moving[:, None], self.rng.uniform(-PLANE_SPREAD, PLANE_SPREAD, s.plane_pos.shape), 0)
+        s.fuel[:] = np.where(moving, np.maximum(s.fuel - s.fuel_burn_rate, 0), s.fuel)
+        s.target_pos += np.where(s.target_alive[:, None],
+                                 self.rng.uniform(-TARGET_SPREAD, TARGET_SPREAD, s.target_pos.shape), 0)
+
+    def resolve(self, start, top, top_pg):
+        # Sequential in target order like main(): a target whose k candidates were all
+        # taken by earlier targets falls back to a full scan of its row
+        s = self.shared
+        for offset in range(len(top)):
+            t = start + offset
+            if not s.target_alive[t] or top_pg[offset, 0] <= 0:
+                continue
+            weapon = pg = None
+            for wi, value in zip(top[offset], top_pg[offset]):
+                if value > 0 and s.weapon_alive[wi]:
+                    weapon, pg = wi, value
+                    break
+            if weapon is None and top_pg[offset, -1] > 0:
+                distance = distance_matrix(s.target_pos[t:t + 1], s.plane_pos)
+                row = np.where(s.weapon_alive, pg_matrix(distance, s.fuel, s)[0], 0)
+                weapon, pg = int(row.argmax()), row.max()
+                if pg <= 0:
+                    weapon = None
+            if weapon is not None:
+                s.weapon_alive[weapon] = False
+                s.target_alive[t] = False
+                self.kills += 1
+                self.pg_total += pg
+
+    def step(self):
+        if not self.active():
+            return False
+        self.move()
+        self.ticks += 1
+        targets = len(self.shared.target_pos)
+        tasks = [(start, min(start + self.chunk_size, targets), self.k, self.sensor_range)
+                 for start in range(0, targets, self.chunk_size)]
+        for start, top, top_pg, pairs in self.pool.imap(_evaluate_chunk, tasks):
+            self.pairs[start:start + len(pairs)] = pairs
+            self.resolve(start, top, top_pg)
+        self.shared.plane_alive &= self.shared.fuel > 0
+        return True
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.shared.close()
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    fleet = synthetic_fleet(planes=40, targets=20000)
+    engine = ParallelEngine(fleet, processes, seed=0)
+    try:
+        for _ in range(5):
+            start = time.perf_counter()
+            if not engine.step():
+                break
+            print(f"Tick {engine.ticks}: {(time.perf_counter() - start) * 1000:.1f} ms, "
+                  f"{engine.kills} kills so far, PG total {engine.pg_total:.4f}")
+    finally:
+        engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from headless import DEFAULT_PARAMETERS, ENGINE_VERSION, run_headless
+
+CACHE_DIR = '.sweep_cache'
+
+def expand_grid(grid):
+    # {'fuel_burn_rate': [1, 2], 'range_scale': [0.1]} -> one parameter dict per combination
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def scenario_digest(scenario):
+    with open(scenario, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def effective_parameters(parameters):
+    # What run_headless will actually use, numbers as floats, so a grid axis left at its
+    # default and 1 against 1.0 address the same run
+    return {name: float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+            for name, value in dict(DEFAULT_PARAMETERS, **parameters).items()}
+
+def cache_key(digest, parameters, seed, engine_version=ENGINE_VERSION):
+    # Content address of one run: renaming a scenario file keeps its hits, editing it does not
+    payload = json.dumps({'scenario': digest, 'parameters': effective_parameters(parameters), 'seed': seed,
+                          'engine_version': engine_version}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResultCache:
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key, result):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, path)  # Readers never see a half-written entry
+
+def _run_cell(cell):
+    key, scenario, seed, parameters, record_ticks = cell
+    return key, run_headless(scenario, seed, record_ticks, **parameters)
+
+def run_sweep(scenarios, grid, seeds, cache=None, processes=None, record_ticks=False, on_result=None):
+    # on_result(record) sees every freshly computed record as it arrives, e.g. to stream it into a ResultsStore
+    cache = cache or ResultCache()
+    digests = {scenario: scenario_digest(scenario) for scenario in scenarios}
+    records = []
+    pending = {}
+    for scenario in scenarios:
+        for parameters in expand_grid(grid):
+            for seed in seeds:
+                key = cache_key(digests[scenario], dict(parameters, record_ticks=True) if record_ticks else parameters, seed)
+                record = {'scenario': scenario, 'seed': seed, 'parameters': parameters, 'key': key,
+                          'result': cache.get(key), 'cached': True}
+                if record['result'] is None:
+                    record['cached'] = False
+                    pending.setdefault(key, []).append(record)
+                records.append(record)
+
+    if pending:
+        cells = [(key, rs[0]['scenario'], rs[0]['seed'], rs[0]['parameters'], record_ticks) for key, rs in pending.items()]
+        with Pool(processes) as pool:
+            for key, result in pool.imap_unordered(_run_cell, cells):
+                cache.put(key, result)
+                for record in pending[key]:
+                    record['result'] = result
+                    if on_result:
+                        on_result(record)
+    return records
+
+def main():
+    scenarios = sys.argv[1:] or ['input_data_3d.csv', 'input_data_3d_beastmode.csv']
+    grid = {
+        'fuel_burn_rate': [1, 2, 4],
+        'plane_spread': [10, 20],
+        'target_spread': [25],
+        'range_scale': [0.05, 0.1, 1.0],
+    }
+    start = time.perf_counter()
+    records = run_sweep(scenarios, grid, seeds=range(5))
+    hits = sum(record['cached'] for record in records)
+    print(f"{len(records)} cells: {hits} cached, {len(records) - hits} run in {time.perf_counter() - start:.2f} s")
+    for record in records[:5]:
+        print(f"{record['scenario']} seed {record['seed']} {record['parameters']}: "
+              f"{record['result']['kills']} kills in {record['result']['ticks']} ticks")
+
+if __name__ == "__main__":
+    main()
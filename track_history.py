@@ -0,0 +1,98 @@
+import sys
+import time
+
+import numpy as np
+
+from fleet import synthetic_fleet
+from kinematics import KinematicEngine
+
+class TrackHistory:
+    # Last `history` positions of every track in one preallocated (..., targets, history, 3)
+    # ring buffer. record() writes a whole tick into the slot at the head with one assignment,
+    # so memory stays fixed however long the run is. `filled` counts the valid samples per
+    # track, which lets a reused slot (a new target in a killed one's place) start over.
+    def __init__(self, shape, history=16):
+        self.shape = tuple(np.atleast_1d(shape))
+        self.history = history
+        self.buffer = np.full(self.shape + (history, 3), np.nan)
+        self.filled = np.zeros(self.shape, dtype=np.intp)
+        self.head = -1
+        self._fits = {}
+
+    def record(self, positions, alive=None):
+        self.head = (self.head + 1) % self.history
+        self.buffer[..., self.head, :] = positions
+        self.filled = np.minimum(self.filled + (1 if alive is None else alive), self.history)
+
+    def reset(self, mask):
+        self.filled[mask] = 0
+
+    def window(self, n):
+        # The last n samples of every track, oldest first: (..., targets, n, 3)
+        return self.buffer[..., (self.head - n + 1 + np.arange(n)) % self.history, :]
+
+    def _fit(self, n, degree):
+        # Rows of the least-squares operator giving polynomial coefficients from n samples
+        # taken at t = -(n - 1) ... 0, the newest at t = 0
+        if (n, degree) not in self._fits:
+            t = np.arange(n) - (n - 1.0)
+            self._fits[n, degree] = np.linalg.pinv(np.vander(t, degree + 1, increasing=True))
+        return self._fits[n, degree]
+
+    def _derivative(self, order, window):
+        # order 1: velocity per tick; order 2: acceleration per tick^2. Each track is fitted over
+        # its last min(window, filled) samples; tracks with too few samples for the order get NaN.
+        window = min(window, self.history)
+        result = np.full(self.shape + (3,), np.nan)
+        for n in np.unique(np.minimum(self.filled, window)):
+            if n <= order:
+                continue
+            degree = min(order + 1, n - 1)
+            tracks = np.minimum(self.filled, window) == n
+            coefficients = np.einsum('cn,...nk->...ck', self._fit(n, degree)[order:order + 1],
+                                     self.window(n)[tracks])
+            result[tracks] = coefficients[..., 0, :] * (1 if order == 1 else 2)
+        return result
+
+    def velocity(self, window=4):
+        return self._derivative(1, window)
+
+    def acceleration(self, window=8):
+        return self._derivative(2, window)
+
+def main():
+    targets = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    fleet = synthetic_fleet(10, targets, seed=0)
+    engine = KinematicEngine(fleet, 1, seed=0)
+    tracks = TrackHistory(engine.target_pos.shape[:-1], history=16)
+    active = np.ones(1, dtype=bool)
+
+    record_ms = 0
+    for tick in range(ticks):
+        engine.move(active)
+        start = time.perf_counter()
+        tracks.record(engine.target_pos, engine.target_alive)
+        record_ms += (time.perf_counter() - start) * 1000
+    print(f"{targets} tracks over {ticks} ticks: {record_ms / ticks:.2f} ms per record, "
+          f"{tracks.buffer.nbytes / 2 ** 20:.1f} MiB however long the run")
+
+    # Wall bounces change velocity outside the motion model, so score only tracks clear of them
+    lo, hi = engine.target_motion.lo, engine.target_motion.hi
+    recent = tracks.window(8)
+    clear = ~((recent == lo) | (recent == hi)).any(axis=(-2, -1))
+    truth = engine.target_motion.velocity()[clear]
+    speed = np.linalg.norm(truth, axis=-1).mean()
+    for window in (2, 4, 8):
+        start = time.perf_counter()
+        estimate = tracks.velocity(window)
+        elapsed = (time.perf_counter() - start) * 1000
+        error = np.sqrt(((estimate[clear] - truth) ** 2).sum(axis=-1).mean())
+        print(f"Velocity over {window} samples: RMS error {error:.2f} against mean speed {speed:.2f}, {elapsed:.1f} ms")
+    start = time.perf_counter()
+    acceleration = tracks.acceleration()
+    print(f"Acceleration over 8 samples: mean magnitude {np.linalg.norm(acceleration, axis=-1).mean():.2f}, "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from headless import run_headless
+from wtpmv6 import load_csv
+
+# Every record is 24 bytes: kind, flag, aux, entity id, then four 4-byte payload slots read
+# as floats (positions, fuel, PG) or ints (ids) depending on the kind
+RECORD = np.dtype([('kind', 'u1'), ('flag', 'u1'), ('aux', '<u2'), ('id', '<i4'),
+                   ('a', '<f4'), ('b', '<f4'), ('c', '<f4'), ('d', '<f4')])
+RECORD_INT = np.dtype([('kind', 'u1'), ('flag', 'u1'), ('aux', '<u2'), ('id', '<i4'),
+                       ('a', '<i4'), ('b', '<i4'), ('c', '<i4'), ('d', '<i4')])
+
+MAGIC = 0x59475453  # b'STGY'
+VERSION = 1
+
+HEADER = 0  # id: version, a: magic, b: keyframe interval
+TICK = 1  # id: tick, flag: 1 on keyframes, a: records that follow for this tick
+PLANE_KEY = 2  # id: plane, a-c: position, d: fuel
+PLANE_DELTA = 3  # id: plane, a-c: position change, d: fuel change
+TARGET_KEY = 4  # id: target, a-c: position
+TARGET_DELTA = 5  # id: target, a-c: position change
+PLANE_GONE = 6  # id: plane that left the fleet
+TARGET_GONE = 7  # id: target that was killed
+REPORT = 8  # id: target, a: reporting plane
+PAIR = 9  # id: target, a, b: selected sensor planes
+SHOT = 10  # id: target, a: plane, then as floats c: weapon range, d: PG
+
+class DeltaEncoder:
+    # Tracks the values a reader will have reconstructed, so float32 rounding in one delta
+    # is corrected by the next one instead of accumulating over a long run
+    def __init__(self, width):
+        self.ids = np.empty(0, dtype=np.int64)  # sorted
+        self.values = np.empty((0, width))
+
+    def encode(self, ids, values, key_kind, delta_kind, gone_kind, keyframe):
+        ids = np.asarray(ids, dtype=np.int64)
+        values = np.asarray(values, dtype=float).reshape(len(ids), self.values.shape[1])
+        order = np.argsort(ids)
+        ids, values = ids[order], values[order]
+
+        if keyframe or not len(self.ids):
+            known = np.zeros(len(ids), dtype=bool)
+            gone = self.ids if not keyframe else np.empty(0, dtype=np.int64)
+        else:
+            slot = np.searchsorted(self.ids, ids).clip(0, len(self.ids) - 1)
+            known = self.ids[slot] == ids
+            gone = self.ids[~np.isin(self.ids, ids, assume_unique=True)]
+
+        reconstructed = values.astype(np.float32).astype(float)
+        keys = _records(key_kind, ids[~known], reconstructed[~known])
+        deltas = np.empty(0, dtype=RECORD)
+        if known.any():
+            previous = self.values[slot[known]]
+            step = (values[known] - previous).astype(np.float32)
+            reconstructed[known] = previous + step
+            changed = (step != 0).any(axis=1)
+            deltas = _records(delta_kind, ids[known][changed], step[changed])
+        self.ids, self.values = ids, reconstructed
+        return [keys, deltas, _records(gone_kind, gone, np.zeros((len(gone), 0)))]
+
+def _records(kind, ids, values):
+    records = np.zeros(len(ids), dtype=RECORD)
+    records['kind'] = kind
+    records['id'] = ids
+    for column, field in zip(np.asarray(values).T, 'abcd'):
+        records[field] = column
+    return records
+
+def _int_records(kind, ids, columns):
+    records = np.zeros(len(ids), dtype=RECORD_INT)
+    records['kind'] = kind
+    records['id'] = ids
+    for column, field in zip(columns, 'abcd'):
+        records[field] = column
+    return records.view(RECORD)
+
+class TrajectoryRecorder:
+    # Append-only binary log of positions, fuel, reports, pairings and shots. Each tick is
+    # encoded with NumPy on the caller's thread and handed to a writer thread through a
+    # bounded queue, so a slow disk applies backpressure instead of growing memory. A write
+    # error is kept and raised on the caller's thread by the next record or by close().
+    def __init__(self, path, keyframe_interval=100, max_pending=64):
+        self.file = open(path, 'wb')
+        self.keyframe_interval = keyframe_interval
+        self.planes = DeltaEncoder(4)
+        self.targets = DeltaEncoder(3)
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+        self.ticks = 0
+        self.records = 0
+        header = _int_records(HEADER, [VERSION], [[MAGIC], [keyframe_interval]])
+        self.pending.put(header.tobytes())
+
+    def _write_loop(self):
+        while True:
+            chunk = self.pending.get()
+            if chunk is None:
+                break
+            if self.error is None:
+                try:
+                    self.file.write(chunk)
+                except Exception as error:
+                    self.error = error  # Keep draining so record_arrays never blocks on a full queue
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def record_arrays(self, tick, plane_ids, plane_state, target_ids, target_pos,
+                      reports=(), pairs=(), shots=()):
+        # plane_state rows are (x, y, z, fuel); reports (plane, target); pairs (target, plane,
+        # plane); shots (plane, target, weapon range, PG)
+        self._raise_error()
+        keyframe = self.ticks % self.keyframe_interval == 0
+        parts = self.planes.encode(plane_ids, plane_state, PLANE_KEY, PLANE_DELTA, PLANE_GONE, keyframe)
+        parts += self.targets.encode(target_ids, target_pos, TARGET_KEY, TARGET_DELTA, TARGET_GONE, keyframe)
+        if len(reports):
+            reports = np.asarray(reports, dtype=np.int64)
+            parts.append(_int_records(REPORT, reports[:, 1], [reports[:, 0]]))
+        if len(pairs):
+            pairs = np.asarray(pairs, dtype=np.int64)
+            parts.append(_int_records(PAIR, pairs[:, 0], [pairs[:, 1], pairs[:, 2]]))
+        if len(shots):
+            shot_records = _int_records(SHOT, [s[1] for s in shots], [[s[0] for s in shots]])
+            shot_records['c'] = [s[2] for s in shots]
+            shot_records['d'] = [s[3] for s in shots]
+            parts.append(shot_records)
+
+        count = sum(len(part) for part in parts)
+        marker = _int_records(TICK, [tick], [[count]])
+        marker['flag'] = keyframe
+        self.pending.put(np.concatenate([marker] + parts).tobytes())
+        self.ticks += 1
+        self.records += count + 1
+
+    def record_tick(self, tick, blue_planes, targets, reports=(), pairs=(), shots=()):
+        # Object-model wrapper; shots are (plane, weapon, target, pg) as run_headless reports them
+        self.record_arrays(
+            tick,
+            [plane.id for plane in blue_planes],
+            [plane.position + (plane.fuel,) for plane in blue_planes],
+            [target.id for target in targets],
+            [target.position for target in targets],
+            [(plane.id, target.id) for plane, target in reports],
+            [(target.id, pair[0].id, pair[1].id) for target, pair in pairs],
+            [(plane.id, target.id, weapon.range, pg) for plane, weapon, target, pg in shots])
+
+    def close(self):
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+        self.file.close()
+        self._raise_error()
+
+def record_synthetic(path, entities, ticks, seed=0):
+    # Random walk of `entities` targets and a tenth as many planes, to measure recording cost
+    rng = np.random.default_rng(seed)
+    plane_ids = np.arange(entities // 10)
+    planes = np.column_stack([rng.uniform(0, 1000, (len(plane_ids), 3)), np.full(len(plane_ids), 1e4)])
+    target_ids = np.arange(entities)
+    targets = rng.uniform(0, 1000, (entities, 3))
+    recorder = TrajectoryRecorder(path)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        planes[:, :3] += rng.uniform(-20, 20, (len(plane_ids), 3))
+        planes[:, 3] -= 2
+        targets += rng.uniform(-25, 25, targets.shape)
+        recorder.record_arrays(tick, plane_ids, planes, target_ids, targets)
+    recorder.close()
+    return recorder, time.perf_counter() - start
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'synthetic':
+        entities = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+        recorder, elapsed = record_synthetic('synthetic.traj', entities, ticks=50)
+        print(f"Recorded {recorder.ticks} ticks of {entities} targets, {recorder.records} records, "
+              f"in {elapsed:.2f} s ({elapsed / recorder.ticks * 1000:.1f} ms per tick)")
+        return
+
+    scenario = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d.csv'
+    recorder = TrajectoryRecorder('run.traj', keyframe_interval=10)
+    # Starting positions as tick 0, so readers know where tick 1's shot targets were
+    recorder.record_tick(0, *load_csv(scenario))
+    result = run_headless(scenario, 0, range_scale=0.1,
+                          on_tick=lambda tick, planes, targets, shots: recorder.record_tick(
+                              tick, planes, targets, shots=shots))
+    recorder.close()
+    print(f"Recorded {recorder.ticks} ticks ({recorder.records} records, {result['kills']} kills) to run.traj")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import sys
+import time
+
+import numpy as np
+
+from batch_sim import BatchEngine
+from fleet import FleetArrays, distance_matrix, pg_matrix, synthetic_fleet
+
+BEARING_SIGMA = np.radians(0.5)  # Angular error of one line-of-sight measurement
+
+def line_of_sight(sensor_pos, target_pos, sigma, rng):
+    # Noisy unit vectors from sensors to targets, same shapes (..., 3): small-angle error as an
+    # isotropic Gaussian offset perpendicular to the true direction
+    direction = target_pos - sensor_pos
+    direction /= np.linalg.norm(direction, axis=-1, keepdims=True)
+    noise = rng.normal(0, sigma, direction.shape)
+    noise -= (noise * direction).sum(axis=-1, keepdims=True) * direction
+    measured = direction + noise
+    return measured / np.linalg.norm(measured, axis=-1, keepdims=True)
+
+def triangulate(origins, directions, sigma=BEARING_SIGMA):
+    # Least-squares intersection of the rays origins + s * directions, (..., 2, 3) each, for all
+    # tracks at once. Each ray contributes its projection onto the plane normal to it, weighted
+    # by the inverse variance of the cross-range error, (range * sigma)^2; ranges come from an
+    # unweighted first solve. Returns (..., 3) estimates and (..., 3, 3) covariances, NaN
+    # where the two rays are too close to parallel to fix a point.
+    projections = np.eye(3) - directions[..., :, None] * directions[..., None, :]  # (..., 2, 3, 3)
+    singular = np.linalg.norm(np.cross(directions[..., 0, :], directions[..., 1, :]), axis=-1) < 1e-6
+    weights = np.ones(directions.shape[:-1])
+    for _ in range(2):
+        information = (projections * weights[..., None, None]).sum(axis=-3)
+        moment = (projections @ origins[..., None])[..., 0] * weights[..., None]
+        information[singular] = np.eye(3)
+        estimate = np.linalg.solve(information, moment.sum(axis=-2)[..., None])[..., 0]
+        ranges = np.linalg.norm(estimate[..., None, :] - origins, axis=-1)
+        weights = 1 / np.maximum(ranges * sigma, 1e-9) ** 2
+    covariance = np.linalg.inv(information)
+    estimate[singular] = np.nan
+    covariance[singular] = np.nan
+    return estimate, covariance
+
+def fuse_pairs(plane_pos, target_pos, pairs, rng, sigma=BEARING_SIGMA):
+    # Triangulated track for every target whose sensor pair is set: plane_pos (B, P, 3),
+    # target_pos (B, T, 3), pairs (B, T, 2) with -1 for none. Unpaired tracks come back NaN.
+    batch = np.arange(pairs.shape[0])[:, None, None]
+    origins = plane_pos[batch, pairs.clip(0)]  # (B, T, 2, 3)
+    directions = line_of_sight(origins, target_pos[..., None, :], sigma, rng)
+    estimate, covariance = triangulate(origins, directions, sigma)
+    unpaired = (pairs < 0).any(axis=-1)
+    estimate[unpaired] = np.nan
+    covariance[unpaired] = np.nan
+    return estimate, covariance
+
+class TrackingEngine(BatchEngine):
+    # BatchEngine that engages on fused tracks: targets with a sensor pair are scored at their
+    # triangulated position, the rest at their reported one as before
+    def __init__(self, fleet, batch, seed=None, sensor_range=np.inf, sigma=BEARING_SIGMA):
+        super().__init__(fleet, batch, seed, sensor_range)
+        self.sigma = sigma
+        self.estimate = None
+        self.covariance = None
+
+    def step(self):
+        active = self.active()
+        if not active.any():
+            return False
+        self.move(active)
+        self.ticks += active
+        self.pairs = self.pair(distance_matrix(self.target_pos, self.plane_pos))
+        self.estimate, self.covariance = fuse_pairs(self.plane_pos, self.target_pos, self.pairs, self.rng, self.sigma)
+        tracks = np.where(np.isnan(self.estimate), self.target_pos, self.estimate)
+        pg = pg_matrix(distance_matrix(tracks, self.plane_pos), self.fuel, self.fleet)
+        live = active[:, None, None] & self.target_alive[..., None] & self.weapon_alive[:, None, :]
+        self.engage(np.where(live, pg, 0))
+        self.plane_alive &= self.fuel > 0  # Remove planes with zero fuel
+        return True
+
+def main():
+    targets = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    fleet = synthetic_fleet(40, targets, seed=0)
+    engine = BatchEngine(fleet, 1, seed=0)
+    engine.pairs = engine.pair(distance_matrix(engine.target_pos, engine.plane_pos))
+
+    start = time.perf_counter()
+    estimate, covariance = fuse_pairs(engine.plane_pos, engine.target_pos, engine.pairs, engine.rng)
+    elapsed = time.perf_counter() - start
+    fused = ~np.isnan(estimate[..., 0])
+    error = (estimate - engine.target_pos)[fused]
+    mahalanobis = np.einsum('ni,nij,nj->n', error, np.linalg.inv(covariance[fused]), error)
+    print(f"Triangulated {fused.sum()} of {targets} tracks in {elapsed * 1000:.1f} ms")
+    print(f"RMS position error {np.sqrt((error ** 2).sum(axis=-1).mean()):.3f}, "
+          f"predicted {np.sqrt(np.trace(covariance[fused], axis1=-2, axis2=-1).mean()):.3f}, "
+          f"mean normalized error {mahalanobis.mean():.2f} (3 when the covariance is consistent)")
+
+    fleet = FleetArrays.from_csv(sys.argv[2] if len(sys.argv) > 2 else 'input_data_3d_beastmode.csv')
+    fleet.weapon_range *= 0.1
+    for engine_class in (BatchEngine, TrackingEngine):
+        engine = engine_class(fleet, 200, seed=0).run()
+        print(f"{engine_class.__name__}: mean kills {engine.kills.mean():.2f}, PG per run {engine.pg_total.mean():.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import sys
+import time
+from multiprocessing import Pool
+
+from wtpmv6 import load_csv
+from assignment import PGTable, total_pg
+
+class ExactSolver:
+    # Depth-first branch and bound over targets, each taking one unused weapon or none.
+    # solve() only has to beat `alpha`: a branch whose PG plus the best unused weapon of every
+    # remaining target cannot do so is cut. Results above alpha are exact and memoized with
+    # their choice; results at or below it are memoized as upper bounds for later visits.
+    def __init__(self, rows, max_nodes=5_000_000):
+        self.rows = rows  # per depth: [(pg, weapon bit)] sorted by PG, best first
+        self.max_nodes = max_nodes
+        self.memo = {}  # (depth, used) -> (value, choice); choice None marks an upper bound
+        self.nodes = 0
+
+    def bound(self, depth, used):
+        total = 0
+        for row in self.rows[depth:]:
+            for pg, bit in row:
+                if not used & bit:
+                    total += pg
+                    break
+        return total
+
+    def solve(self, depth=0, used=0, alpha=-1.0):
+        if depth == len(self.rows):
+            return 0, ()
+        key = (depth, used)
+        cached = self.memo.get(key)
+        if cached and (cached[1] is not None or cached[0] <= alpha):
+            return cached
+        bound = self.bound(depth, used)
+        if bound <= alpha:
+            return bound, None
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise RuntimeError(f"Exact solver exceeded {self.max_nodes} nodes; scenario is too large")
+
+        best_value, best_choice = alpha, None
+        upper = -1.0
+        for pg, bit in self.rows[depth] + [(0, 0)]:  # (0, 0) leaves this target unassigned
+            if used & bit:
+                continue
+            value, choice = self.solve(depth + 1, used | bit, best_value - pg)
+            if choice is not None and pg + value > best_value:
+                best_value, best_choice = pg + value, (bit or None,) + choice
+            else:
+                upper = max(upper, pg + value)
+        result = (best_value, best_choice) if best_choice is not None else (min(upper, bound), None)
+        self.memo[key] = result
+        return result
+
+def solver_rows(table):
+    # Targets with the highest PG go first so the bound tightens early; a target never needs
+    # more than len(targets) candidates since the others can hold at most that many weapons
+    order = sorted((ti for ti, row in enumerate(table.values) if row),
+                   key=lambda ti: max(table.values[ti].values()), reverse=True)
+    rows = []
+    for ti in order:
+        ranked = sorted(table.values[ti].items(), key=lambda item: item[1], reverse=True)[:len(order)]
+        rows.append([(pg, 1 << wi) for wi, pg in ranked])
+    return order, rows
+
+def _solve_subtree(args):
+    rows, first_pg, first_bit, alpha, max_nodes = args
+    solver = ExactSolver(rows, max_nodes)
+    value, choice = solver.solve(1, first_bit, alpha - first_pg)
+    if choice is None:
+        return None, None, solver.nodes
+    return first_pg + value, (first_bit or None,) + choice, solver.nodes
+
+def sequential_greedy(table):
+    # What select_best_weapon does in main(): each target in list order takes its best unused weapon
+    assigned = {}
+    used = set()
+    for ti, row in enumerate(table.values):
+        free = [(pg, wi) for wi, pg in row.items() if wi not in used]
+        if free:
+            assigned[ti] = max(free)[1]
+            used.add(assigned[ti])
+    return assigned
+
+class OracleResult:
+    def __init__(self, table, assigned, greedy, nodes, elapsed):
+        self.table = table
+        self.assigned = assigned  # target index -> weapon index
+        self.optimal_pg = total_pg(table, assigned)
+        self.greedy_pg = total_pg(table, greedy)
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    def gap(self):
+        return (self.optimal_pg - self.greedy_pg) / self.optimal_pg if self.optimal_pg > 0 else 0.0
+
+def solve_exact(blue_planes, targets, processes=1, max_nodes=5_000_000):
+    start = time.perf_counter()
+    table = PGTable(blue_planes, targets)
+    order, rows = solver_rows(table)
+
+    greedy = sequential_greedy(table)
+    alpha = total_pg(table, greedy) * (1 - 1e-9) - 1e-12  # The greedy answer is the first incumbent
+
+    if processes > 1 and rows:
+        # Each first-target choice (and leaving it unassigned) is an independent subtree
+        tasks = [(rows, pg, bit, alpha, max_nodes) for pg, bit in rows[0] + [(0, 0)]]
+        with Pool(processes) as pool:
+            results = pool.map(_solve_subtree, tasks)
+        _, choice, _ = max((r for r in results if r[1] is not None), key=lambda r: r[0])
+        nodes = sum(r[2] for r in results)
+    else:
+        solver = ExactSolver(rows, max_nodes)
+        _, choice = solver.solve(0, 0, alpha)
+        nodes = solver.nodes
+
+    assigned = {ti: bit.bit_length() - 1 for ti, bit in zip(order, choice) if bit}
+    return OracleResult(table, assigned, greedy, nodes, time.perf_counter() - start)
+
+def main():
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'input_data_3d.csv'
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    blue_planes, targets = load_csv(filename)
+    result = solve_exact(blue_planes, targets, processes)
+
+    for ti, wi in sorted(result.assigned.items()):
+        plane, weapon = result.table.weapons[wi]
+        print(f"Target {result.table.targets[ti].id}: Plane {plane.id} with weapon range {weapon.range} km "
+              f"and PG {result.table.values[ti][wi]:.4f}")
+    print(f"\nOptimal PG {result.optimal_pg:.4f}, greedy PG {result.greedy_pg:.4f}, gap {result.gap():.2%} "
+          f"({result.nodes} nodes in {result.elapsed:.2f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -94,11 +94,21 @@ def angle_between(s1, s2, target):
     angle = math.degrees(math.acos(dot_product / (mag_v1 * mag_v2)))
     return angle
 
+def pg_at_distance(plane, weapon, distance):
+    return (1 / distance) * weapon.kinematics * weapon.expiring_factor * (plane.fuel / 100)
+
+def compute_pg(plane, weapon, target):
+    # Same value as probability_of_guide without the per-call log line
+    distance = distance_3d(plane.position, target.position)
+    if distance > weapon.range:
+        return 0
+    return pg_at_distance(plane, weapon, distance)
+
 def probability_of_guide(plane, weapon, target):
     distance = distance_3d(plane.position, target.position)
     if distance > weapon.range:
         return 0
-    pg = (1 / distance) * weapon.kinematics * weapon.expiring_factor * (plane.fuel / 100)
+    pg = pg_at_distance(plane, weapon, distance)
     print(f"PG Calculation for Plane {plane.id} with weapon range {weapon.range} km and Target {target.id}: "
           f"Distance = {distance:.2f} km, Kinematics = {weapon.kinematics}, Expiring Factor = {weapon.expiring_factor}, "
           f"Fuel = {plane.fuel}, PG = {pg:.4f}")